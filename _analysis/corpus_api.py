@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# _analysis/corpus_api.py
+
+import os
+import re
+from collections import Counter, OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+from corpus_archive import CorpusArchive
+from corpus_walker import CorpusWalker
+
+# 精确的层级映射（基于实际目录结构）
+LAYER_MAP = {
+    # Autopsia 自省
+    "inc": "000_autopsia/010_incisio",
+    "pat": "000_autopsia/020_pathologia",
+    "sat": "000_autopsia/030_satura",
+    # Ingesta 摄取
+    "frag": "100_ingesta/110_fragmenta",
+    "rel": "100_ingesta/120_reliquia",
+    "imp": "100_ingesta/130_impressio",
+    "org": "100_ingesta/140_organon",
+    "tox": "100_ingesta/150_toxicon",
+    # Neoplasma 增生
+    "cor": "200_neoplasma/210_cor",
+    "vas": "200_neoplasma/220_vascula",
+    "aby": "200_neoplasma/230_oblivium/231_abyssus",
+    "nod": "200_neoplasma/230_oblivium/232_nodus",
+    "hal": "200_neoplasma/230_oblivium/233_hallucina",
+    "flu": "200_neoplasma/230_oblivium/234_fluxus",
+    "fra": "200_neoplasma/230_oblivium/235_fractura",
+    "chi": "200_neoplasma/230_oblivium/236_chimera",
+    "eru": "200_neoplasma/240_eruptio",
+    # Putredo 腐朽
+    "mia": "300_putredo/310_miasma",
+    "ulc": "300_putredo/320_ulcus",
+    "exh": "300_putredo/330_exhumatio",
+    # 特殊层级
+    "del": "400_delirium",
+    "vig": "500_vigil",
+}
+
+# 概念提取时过滤的常用词（可以扩展）
+STOPWORDS = frozenset(
+    {
+        "the", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by",
+        "是", "的", "了", "在", "和", "与", "或者", "但是", "因为", "所以", "这个", "那个",
+    }
+)
+
+# libyaml 可用时使用 C 实现的 SafeLoader（解析速度约快十倍）
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# 以 @ 开头的 frontmatter 值（如 citation_key: @key）
+CITATION_VALUE_PATTERN = re.compile(r"^([\w-]+:[ \t]*)(@.*?)[ \t]*$", re.M)
+
+# 模板占位符（如 {{date}}），不是合法的 YAML 标量
+PLACEHOLDER_VALUE_PATTERN = re.compile(r"(\{\{\w+\}\})")
+
+# [[target]]、[[target|alias]]、[[target#heading]]
+WIKILINK_PATTERN = re.compile(r"\[\[([^\]|#]+)(?:#[^\]|]*)?(?:\|[^\]]*)?\]\]")
+
+
+# -----------------------
+# 解析函数
+# -----------------------
+def parse_stamp(digits):
+    """解析文件名中的 YYYYMMDD[HHMMSS]（按定长切片，比 strptime 快一个数量级）"""
+    return datetime(
+        int(digits[0:4]),
+        int(digits[4:6]),
+        int(digits[6:8]),
+        int(digits[8:10] or 0),
+        int(digits[10:12] or 0),
+        int(digits[12:14] or 0),
+    )
+
+
+def creation_time_from_name(filename):
+    """从文件名中的时间戳或日期提取创建时间，无法解析时返回 None"""
+    # 方法1: 从文件名提取时间戳（如 cmd_name_20241029123456.md）
+    timestamp_match = re.search(r"(\d{14})", filename)
+    if timestamp_match:
+        try:
+            return parse_stamp(timestamp_match.group(1))
+        except ValueError:
+            pass
+
+    # 方法2: 从文件名提取日期（如 cmd_name_20241029.md）
+    date_match = re.search(r"(\d{8})", filename)
+    if date_match:
+        try:
+            return parse_stamp(date_match.group(1))
+        except ValueError:
+            pass
+    return None
+
+
+def quote_citation_values(frontmatter_text):
+    """把 @citation 值转为 YAML 字符串（YAML 中 @ 为保留字符）"""
+    return CITATION_VALUE_PATTERN.sub(r'\1"\2"', frontmatter_text)
+
+
+def parse_frontmatter(content, placeholders=False):
+    """解析 frontmatter；缺失时返回 None，格式错误时抛出 yaml.YAMLError
+
+    placeholders 为真时先把模板占位符 {{...}} 转为字符串（用于检查模板）。
+    """
+    if not content.startswith("---"):
+        return None
+    yaml_end = content.find("---", 3)
+    if yaml_end == -1:
+        return None
+    frontmatter_text = content[3:yaml_end]
+    if placeholders:
+        frontmatter_text = PLACEHOLDER_VALUE_PATTERN.sub(r'"\1"', frontmatter_text)
+    frontmatter_text = quote_citation_values(frontmatter_text)
+    return yaml.load(frontmatter_text, Loader=YAML_LOADER) or {}
+
+
+def extract_frontmatter(content):
+    """提取YAML frontmatter（缺失或格式错误时返回空字典）"""
+    try:
+        return parse_frontmatter(content) or {}
+    except yaml.YAMLError:
+        return {}
+
+
+def extract_body(content):
+    """提取正文内容（去除frontmatter）"""
+    if content.startswith("---"):
+        yaml_end = content.find("---", 3)
+        if yaml_end != -1:
+            return content[yaml_end + 3 :].strip()
+    return content
+
+
+def extract_concepts(content):
+    """提取关键概念（长度>=2 的词，过滤常用词）"""
+    # 移除标点和特殊字符，转为小写
+    clean_content = re.sub(r"[^\w\s\u4e00-\u9fff]", " ", content.lower())
+    words = re.findall(r"[\w\u4e00-\u9fff]{2,}", clean_content)
+    return Counter(w for w in words if w not in STOPWORDS)
+
+
+def extract_links(content):
+    """提取 wiki 链接目标（去重，保持出现顺序）"""
+    return list(dict.fromkeys(m.strip() for m in WIKILINK_PATTERN.findall(content)))
+
+
+# -----------------------
+# 对象接口
+# -----------------------
+class NoteContent:
+    """单次读取的笔记内容视图（对应一次 mtime 检查），字段按需计算并缓存于 Corpus"""
+
+    __slots__ = ("_parsed",)
+
+    def __init__(self, parsed):
+        self._parsed = parsed
+
+    def _get(self, key, compute):
+        parsed = self._parsed
+        if key not in parsed:
+            parsed[key] = compute()
+        return parsed[key]
+
+    @property
+    def content(self):
+        return self._parsed["content"]
+
+    @property
+    def frontmatter(self):
+        def compute():
+            frontmatter = extract_frontmatter(self.content)
+            return frontmatter if isinstance(frontmatter, dict) else {}
+
+        return self._get("frontmatter", compute)
+
+    @property
+    def body(self):
+        return self._get("body", lambda: extract_body(self.content))
+
+    @property
+    def word_count(self):
+        return self._get("word_count", lambda: len(self.body.split()))
+
+    @property
+    def concepts(self):
+        return self._get("concepts", lambda: extract_concepts(self.body))
+
+    @property
+    def links(self):
+        return self._get("links", lambda: extract_links(self.body))
+
+    @property
+    def status(self):
+        return str(self.frontmatter.get("status") or "unknown")
+
+
+class Note:
+    """单篇笔记：路径、层级与创建时间来自目录列表，内容相关属性按需解析
+
+    解析结果不保存在 Note 上，而是存于所属 Corpus 的 LRU 缓存中，
+    因此遍历大量 Note 不会累积内容。每次访问内容属性都会检查 mtime；
+    需要多个字段时用 read() 取得一次性视图，只检查一次。
+    """
+
+    __slots__ = ("corpus", "relpath", "layer", "archived", "_path", "_created")
+
+    def __init__(self, corpus, relpath, layer, path=None, archived=False):
+        self.corpus = corpus
+        self.relpath = relpath
+        self.layer = layer
+        self.archived = archived
+        self._path = path
+        self._created = None
+
+    def __repr__(self):
+        return f"Note({self.relpath!r}, layer={self.layer!r})"
+
+    @property
+    def path(self):
+        if self._path is None:
+            self._path = os.path.join(self.corpus.corpus_dir, self.relpath)
+        return Path(self._path)
+
+    @property
+    def filename(self):
+        return self.relpath.rpartition("/")[2]
+
+    @property
+    def created(self):
+        """创建时间：文件名 → 归档元数据 → git 首次提交 → mtime（均不打开文件）"""
+        if self._created is None:
+            self._created = self.corpus._creation_time(self)
+        return self._created
+
+    @property
+    def mtime_ns(self):
+        if self.archived:
+            return self.corpus.archive.entries[self.relpath]["mtime_ns"]
+        return os.stat(self._path or self.path).st_mtime_ns
+
+    def read(self):
+        """读取当前内容（mtime 未变时取自缓存），返回 NoteContent"""
+        return NoteContent(self.corpus._parsed(self))
+
+    # 以下属性读取文件，结果缓存于 Corpus
+    @property
+    def content(self):
+        return self.read().content
+
+    @property
+    def frontmatter(self):
+        return self.read().frontmatter
+
+    @property
+    def body(self):
+        return self.read().body
+
+    @property
+    def word_count(self):
+        return self.read().word_count
+
+    @property
+    def concepts(self):
+        return self.read().concepts
+
+    @property
+    def links(self):
+        return self.read().links
+
+    @property
+    def status(self):
+        return self.read().status
+
+    def to_dict(self):
+        """不读取文件的概要（用于 JSON 输出）"""
+        created = self.created
+        return {
+            "path": self.relpath,
+            "layer": self.layer,
+            "created": created.isoformat(timespec="seconds") if created else None,
+            "archived": self.archived,
+        }
+
+
+class Corpus:
+    """Corpus 目录：单次遍历枚举 Note，内容解析结果按 mtime 失效的 LRU 缓存"""
+
+    def __init__(self, corpus_dir, layer_map=None, cache_size=1024):
+        self.corpus_dir = Path(corpus_dir)
+        self.layer_map = dict(layer_map or LAYER_MAP)
+        self.walker = CorpusWalker(self.corpus_dir, self.layer_map)
+        self.archive = CorpusArchive(self.corpus_dir)
+        # relpath -> git 首次提交时间，由 MetadataIndex 在 --git 模式下填充
+        self.git_created = {}
+        self.cache_size = cache_size
+        # relpath -> (mtime_ns, 解析结果)
+        self._cache = OrderedDict()
+
+    def __iter__(self):
+        return self.notes()
+
+    def __getstate__(self):
+        # 跨进程传递（如多 Corpus 并行分析的结果）时不携带解析缓存
+        state = self.__dict__.copy()
+        state["_cache"] = OrderedDict()
+        return state
+
+    def notes(self, layers=None, start=None, end=None):
+        """枚举笔记（含已归档），可按层级与创建时间过滤"""
+        prefix_len = len(str(self.corpus_dir)) + 1
+        seen = set()
+        for entry, layer_key in self.walker.walk(layers):
+            relpath = entry.path[prefix_len:].replace(os.sep, "/")
+            seen.add(relpath)
+            note = Note(self, relpath, layer_key, entry.path)
+            if _in_range(note, start, end):
+                yield note
+
+        # 已归档的文件又出现在磁盘上时（如 git checkout 还原）以磁盘文件为准
+        for relpath, entry in self.archive.entries.items():
+            layer_key = entry["metadata"]["layer"]
+            if relpath in seen or (layers and layer_key not in layers):
+                continue
+            note = Note(self, relpath, layer_key, archived=True)
+            if _in_range(note, start, end):
+                yield note
+
+    def note(self, relpath):
+        """按相对路径获取笔记，不属于任何层级时返回 None"""
+        relpath = Path(relpath).as_posix()
+        if relpath in self.archive and not (self.corpus_dir / relpath).exists():
+            return Note(self, relpath, self.archive.metadata(relpath)["layer"], archived=True)
+        layer_key = self.walker.resolve(relpath)
+        if layer_key is None:
+            return None
+        return Note(self, relpath, layer_key)
+
+    def _creation_time(self, note):
+        created = creation_time_from_name(note.filename)
+        if created:
+            return created
+
+        if note.archived:
+            created = self.archive.metadata(note.relpath).get("created")
+            return datetime.fromisoformat(created) if created else None
+
+        # 方法3: 使用 git 首次提交时间（checkout 后 mtime 不可靠）
+        if note.relpath in self.git_created:
+            return datetime.fromtimestamp(self.git_created[note.relpath])
+
+        # 方法4: 使用文件的修改时间
+        try:
+            # 与 os.stat().st_mtime 相同的换算（sec + nsec * 1e-9）
+            seconds, nanoseconds = divmod(note.mtime_ns, 1_000_000_000)
+            return datetime.fromtimestamp(seconds + nanoseconds * 1e-9)
+        except OSError:
+            return None
+
+    def _parsed(self, note):
+        """笔记的解析结果缓存（mtime 变化时重新读取）"""
+        mtime_ns = note.mtime_ns
+        cached = self._cache.get(note.relpath)
+        if cached is not None and cached[0] == mtime_ns:
+            self._cache.move_to_end(note.relpath)
+            return cached[1]
+
+        if note.archived:
+            content = self.archive.read_text(note.relpath)
+        else:
+            with open(note.path, "r", encoding="utf-8") as f:
+                content = f.read()
+
+        parsed = {"content": content}
+        self._cache[note.relpath] = (mtime_ns, parsed)
+        self._cache.move_to_end(note.relpath)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return parsed
+
+
+def _in_range(note, start, end):
+    if start is None and end is None:
+        return True
+    created = note.created
+    if created is None:
+        return False
+    return (start is None or start <= created) and (end is None or created <= end)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# _analysis/corpus_archive.py
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 单个 pack 文件的大小上限，超过后开始新的 pack
+PACK_LIMIT = 64 * 1024 * 1024
+
+
+class ArchiveError(RuntimeError):
+    pass
+
+
+class CorpusArchive:
+    """冷存储归档：笔记逐篇 zlib 压缩后追加写入 pack 文件
+
+    index.json 记录 path -> (pack, offset, length, metadata)。元数据查询
+    只读索引，不解压正文；读取正文时按偏移量随机访问单篇笔记。
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, corpus_dir):
+        self.corpus_dir = Path(corpus_dir)
+        self.archive_dir = self.corpus_dir / "_archive"
+        self.index_path = self.archive_dir / "index.json"
+        self._entries = None
+
+    @property
+    def entries(self):
+        """relpath -> 索引条目（首次访问时加载）"""
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                return self._entries
+            except (OSError, ValueError) as e:
+                raise ArchiveError(f"cannot read archive index: {e}")
+            if data.get("version") != self.INDEX_VERSION:
+                raise ArchiveError("unsupported archive index version")
+            self._entries = data.get("entries", {})
+        return self._entries
+
+    def exists(self):
+        return self.index_path.exists()
+
+    def __contains__(self, relpath):
+        return relpath in self.entries
+
+    def metadata(self, relpath):
+        """归档笔记的元数据（不解压正文）"""
+        return self.entries[relpath]["metadata"]
+
+    def read_bytes(self, relpath):
+        """按偏移量读取并解压单篇笔记"""
+        entry = self.entries[relpath]
+        with open(self.archive_dir / entry["pack"], "rb") as f:
+            f.seek(entry["offset"])
+            blob = f.read(entry["length"])
+        data = zlib.decompress(blob)
+        if hashlib.sha1(data).hexdigest() != entry["sha1"]:
+            raise ArchiveError(f"checksum mismatch for {relpath}")
+        return data
+
+    def read_text(self, relpath):
+        return self.read_bytes(relpath).decode("utf-8")
+
+    # -----------------------
+    # 写入
+    # -----------------------
+    def _save_index(self):
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": self.INDEX_VERSION, "entries": self.entries},
+                f,
+                ensure_ascii=False,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    def _current_pack(self):
+        packs = sorted(self.archive_dir.glob("pack-*.pack"))
+        if packs and packs[-1].stat().st_size < PACK_LIMIT:
+            return packs[-1]
+        number = int(packs[-1].stem.split("-")[1]) + 1 if packs else 1
+        return self.archive_dir / f"pack-{number:04d}.pack"
+
+    def pack(self, relpaths, describe, remove=True):
+        """归档笔记：追加写入 pack、校验后更新索引并删除原文件
+
+        describe(relpath, content, stat) 返回该笔记的元数据字典。
+        """
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        packed = []
+        pack_path = self._current_pack()
+
+        with open(pack_path, "ab") as pack_file:
+            for relpath in relpaths:
+                filepath = self.corpus_dir / relpath
+                with open(filepath, "rb") as f:
+                    data = f.read()
+                stat = filepath.stat()
+
+                blob = zlib.compress(data, 9)
+                offset = pack_file.tell()
+                pack_file.write(blob)
+
+                self.entries[relpath] = {
+                    "pack": pack_path.name,
+                    "offset": offset,
+                    "length": len(blob),
+                    "size": len(data),
+                    "sha1": hashlib.sha1(data).hexdigest(),
+                    "mtime_ns": stat.st_mtime_ns,
+                    "metadata": describe(relpath, data.decode("utf-8"), stat),
+                }
+                packed.append(relpath)
+
+            pack_file.flush()
+            os.fsync(pack_file.fileno())
+
+        # 确认可以逐字节还原后才更新索引并删除原文件
+        for relpath in packed:
+            if self.read_bytes(relpath) != (self.corpus_dir / relpath).read_bytes():
+                raise ArchiveError(f"verification failed for {relpath}")
+        self._save_index()
+
+        if remove:
+            for relpath in packed:
+                (self.corpus_dir / relpath).unlink()
+        return packed
+
+    def unpack(self, relpaths, overwrite=False):
+        """还原归档笔记（内容与 mtime 与归档前一致）并从索引中移除"""
+        restored = []
+        for relpath in relpaths:
+            if relpath not in self.entries:
+                raise ArchiveError(f"not archived: {relpath}")
+            filepath = self.corpus_dir / relpath
+            if filepath.exists() and not overwrite:
+                raise ArchiveError(f"refusing to overwrite existing file: {relpath}")
+
+            data = self.read_bytes(relpath)
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = filepath.with_name(f".{filepath.name}.unpack")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            mtime_ns = self.entries[relpath]["mtime_ns"]
+            os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+            os.replace(tmp_path, filepath)
+            restored.append(relpath)
+
+        for relpath in restored:
+            del self.entries[relpath]
+        self._save_index()
+
+        # pack 文件只追加不改写；不再被引用的 pack 整个删除
+        referenced = {entry["pack"] for entry in self.entries.values()}
+        for pack_path in self.archive_dir.glob("pack-*.pack"):
+            if pack_path.name not in referenced:
+                pack_path.unlink()
+        return restored
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corpus Cold-Storage Archive')
+    parser.add_argument('--corpus-dir',
+                       help='Override CORPUS_DIR environment variable')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    pack_parser = subparsers.add_parser('pack', help='Move matching notes into the archive')
+    pack_parser.add_argument('--layer',
+                            help='Only notes in these layers (comma-separated): mia,ulc,...')
+    pack_parser.add_argument('--older-than',
+                            help='Only notes created more than N days ago (e.g. 365d)')
+    pack_parser.add_argument('--status',
+                            help='Only notes with these statuses (comma-separated): archive,...')
+    pack_parser.add_argument('--dry-run', action='store_true',
+                            help='List the notes that would be packed')
+
+    unpack_parser = subparsers.add_parser('unpack', help='Restore archived notes to disk')
+    unpack_parser.add_argument('paths', nargs='*',
+                              help='Archived note paths (relative to CORPUS_DIR)')
+    unpack_parser.add_argument('--all', action='store_true',
+                              help='Restore every archived note')
+
+    subparsers.add_parser('list', help='List archived notes')
+
+    cat_parser = subparsers.add_parser('cat', help='Print an archived note')
+    cat_parser.add_argument('path')
+
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus_dir or os.environ.get('CORPUS_DIR')
+    if not corpus_dir or not Path(corpus_dir).is_dir():
+        print("Error: CORPUS_DIR not set or not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    archive = CorpusArchive(corpus_dir)
+
+    try:
+        if args.action == 'pack':
+            _pack(archive, corpus_dir, args)
+        elif args.action == 'unpack':
+            paths = sorted(archive.entries) if args.all else args.paths
+            if not paths:
+                print("Error: specify archived paths or --all", file=sys.stderr)
+                sys.exit(1)
+            restored = archive.unpack(paths)
+            print(f"Restored {len(restored)} note(s)")
+        elif args.action == 'list':
+            for relpath, entry in sorted(archive.entries.items()):
+                meta = entry["metadata"]
+                print(f"{(meta.get('created') or '-')[:10]}  {meta['layer']:<5} "
+                      f"{meta['status']:<10} {entry['size']:>8}B  {relpath}")
+        elif args.action == 'cat':
+            sys.stdout.write(archive.read_text(args.path))
+    except KeyError as e:
+        print(f"Error: not archived: {e}", file=sys.stderr)
+        sys.exit(1)
+    except (ArchiveError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _pack(archive, corpus_dir, args):
+    from corpus_index import MetadataIndex
+
+    if not (args.layer or args.older_than or args.status):
+        print("Error: specify at least one of --layer, --older-than, --status", file=sys.stderr)
+        sys.exit(1)
+
+    layers = [l.strip() for l in args.layer.split(",")] if args.layer else None
+    statuses = [s.strip() for s in args.status.split(",")] if args.status else None
+    cutoff = None
+    if args.older_than:
+        try:
+            cutoff = datetime.now() - timedelta(days=int(args.older_than.rstrip("d")))
+        except ValueError:
+            print(f"Error: invalid --older-than '{args.older_than}'", file=sys.stderr)
+            sys.exit(1)
+
+    index = MetadataIndex(corpus_dir)
+    index.load()
+    if index.refresh():
+        index.save()
+
+    selected = []
+    for relpath, record in sorted(index.records.items()):
+        if record.get("archived"):
+            continue
+        if layers and record["layer"] not in layers:
+            continue
+        if statuses and record["status"] not in statuses:
+            continue
+        if cutoff and not (
+            record["created"] and datetime.fromisoformat(record["created"]) < cutoff
+        ):
+            continue
+        selected.append(relpath)
+
+    if args.dry_run:
+        for relpath in selected:
+            print(relpath)
+        print(f"Would pack {len(selected)} note(s)", file=sys.stderr)
+        return
+
+    def describe(relpath, content, stat):
+        layer_key = index.summarizer.walker.resolve(relpath)
+        return index.describe(archive.corpus_dir / relpath, content, layer_key, stat)
+
+    packed = archive.pack(selected, describe)
+    # 索引中的对应记录改由归档提供
+    if index.refresh():
+        index.save()
+    print(f"Packed {len(packed)} note(s) into {archive.archive_dir.name}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# _analysis/corpus_bulk.py
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from corpus_layers import load_layer_table
+from corpus_lint import load_schemas
+
+CITATION_PATTERN = re.compile(r"^@[a-zA-Z0-9_-]+")
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+
+class CompiledTemplate:
+    """预编译模板：按占位符切分一次，之后每篇笔记只做一次拼接"""
+
+    def __init__(self, text):
+        # 模板中的 status 为固定值，转换为占位符以支持清单覆盖；未指定时保留模板值
+        self.defaults = {}
+        status_match = re.search(r"^status: *(.*)$", text, re.M)
+        if status_match:
+            self.defaults["status"] = status_match.group(1)
+            text = (
+                text[: status_match.start()]
+                + "status: {{status}}"
+                + text[status_match.end() :]
+            )
+
+        parts = PLACEHOLDER_PATTERN.split(text)
+        self.literals = parts[0::2]
+        self.names = parts[1::2]
+
+    def render(self, values):
+        """展开模板，未提供的占位符原样保留（与 corpus_expand_template 一致）"""
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = values.get(name)
+            if value is None:
+                value = self.defaults.get(name)
+            out.append("{{" + name + "}}" if value is None else str(value))
+            out.append(literal)
+        return "".join(out)
+
+
+def safe_filename(text):
+    """与 corpus_safe_filename 相同的文件名清洗规则"""
+    safe = text.replace(" ", "_")
+    safe = re.sub(r"[^a-zA-Z0-9\u4e00-\u9fff_-]", "_", safe)
+    safe = re.sub(r"_{2,}", "_", safe)
+    safe = safe.strip("_")
+    return safe or "unnamed"
+
+
+def read_manifest(manifest_path):
+    """读取 CSV 或 JSONL 清单，返回 [(行号, dict)]"""
+    manifest_path = Path(manifest_path)
+    rows = []
+    with open(manifest_path, "r", encoding="utf-8", newline="") as f:
+        if manifest_path.suffix.lower() in (".jsonl", ".ndjson", ".json"):
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if line:
+                    rows.append((line_no, json.loads(line)))
+        else:
+            # 表头占第 1 行
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                rows.append((line_no, {k: v for k, v in row.items() if v != ""}))
+    return rows
+
+
+def parse_created(value):
+    """解析清单中的创建时间，缺省为当前时间"""
+    if not value:
+        return datetime.now().replace(microsecond=0)
+    value = str(value).strip()
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M",
+                "%Y%m%d%H%M%S", "%Y-%m-%d", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"invalid created value '{value}'")
+
+
+class BulkCreator:
+    """批量创建笔记：模板只编译一次，文件名无冲突，原子写入"""
+
+    def __init__(self, corpus_dir, default_status=None):
+        self.corpus_dir = Path(corpus_dir)
+        self.default_status = default_status
+        self.layers = load_layer_table(self.corpus_dir)
+        self._templates = {}
+        # 层级 -> 模板文件名；按 frontmatter layer 索引的模板（按需加载）
+        self._template_names = {}
+        self._schemas = None
+        # 目录 -> 已占用文件名集合（每个目录只列出一次）
+        self._taken = {}
+        # (目录, 基准名, 时间) -> 下一个候选序号
+        self._offsets = {}
+
+    def _template(self, name):
+        template = self._templates.get(name)
+        if template is None:
+            template_path = self.corpus_dir / "_template" / name
+            with open(template_path, "r", encoding="utf-8") as f:
+                template = self._templates[name] = CompiledTemplate(f.read())
+        return template
+
+    def _template_name(self, spec):
+        """层级对应的模板：tp_<别名>.md，不存在时按模板 frontmatter 的 layer 查找"""
+        name = self._template_names.get(spec.alias)
+        if name is None:
+            name = f"tp_{spec.alias}.md"
+            if not (self.corpus_dir / "_template" / name).exists():
+                if self._schemas is None:
+                    self._schemas = load_schemas(self.corpus_dir)
+                schema = self._schemas.get(f"{spec.full_name}:")
+                if schema is None:
+                    raise ValueError(f"no template for layer '{spec.alias}' in _template/")
+                name = schema["template"]
+            self._template_names[spec.alias] = name
+        return name
+
+    def _taken_names(self, target_dir):
+        taken = self._taken.get(target_dir)
+        if taken is None:
+            try:
+                taken = set(os.listdir(target_dir))
+            except FileNotFoundError:
+                taken = set()
+            self._taken[target_dir] = taken
+        return taken
+
+    def _candidate_names(self, target_dir, stem, include_date, created):
+        """按 corpus_generate_filename 规则生成候选文件名，冲突时顺延"""
+        # 同一基准名从上次分配的位置继续，避免大量重名时反复探测
+        key = (target_dir, stem, created if include_date else None)
+        offset = self._offsets.get(key, 0)
+        while True:
+            self._offsets[key] = offset
+            if include_date:
+                timestamp = created + timedelta(seconds=offset)
+                yield f"{stem}_{timestamp.strftime('%Y%m%d%H%M%S')}.md"
+            elif offset == 0:
+                yield f"{stem}.md"
+            else:
+                yield f"{stem}_{offset + 1}.md"
+            offset += 1
+
+    def _write_atomic(self, target_dir, names, content):
+        """写入临时文件后以硬链接落盘，已存在的文件名绝不覆盖"""
+        taken = self._taken_names(target_dir)
+        tmp_path = target_dir / f".bulk-{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        try:
+            for name in names:
+                if name in taken:
+                    continue
+                final_path = target_dir / name
+                try:
+                    os.link(tmp_path, final_path)
+                except FileExistsError:
+                    taken.add(name)
+                    continue
+                except OSError:
+                    # 不支持硬链接的文件系统退回到存在性检查 + rename
+                    if final_path.exists():
+                        taken.add(name)
+                        continue
+                    os.replace(tmp_path, final_path)
+                taken.add(name)
+                return final_path
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def create(self, row, dry_run=False):
+        """按清单行创建一篇笔记，返回路径"""
+        layer_arg = str(row.get("layer", "")).strip()
+        spec = self.layers.get(layer_arg) or next(
+            (s for s in self.layers.values() if s.full_name == layer_arg), None
+        )
+        if spec is None:
+            raise ValueError(f"unknown layer '{layer_arg}'")
+
+        layer = spec.alias
+        content = str(row.get("content") or row.get("title") or "").strip()
+        if spec.requires_arg and not content:
+            raise ValueError(f"layer '{layer}' requires content")
+
+        template_name = self._template_name(spec)
+        include_date = spec.include_date
+        citation_key = ""
+        values = {
+            "layer": spec.path,
+            "status": row.get("status") or self.default_status,
+            "title": content,
+        }
+
+        if layer == "rel" and (
+            CITATION_PATTERN.match(content) or row.get("type") == "paper"
+        ):
+            template_name = "tp_rel_paper.md"
+            include_date = False
+            if CITATION_PATTERN.match(content):
+                values["citation_key"] = content
+                values["title"] = ""
+            for key in ("citation_key", "title", "author", "year", "journal", "doi"):
+                if row.get(key):
+                    values[key] = row[key]
+                values.setdefault(key, "")
+            citation_key = str(values["citation_key"]).strip()
+
+        for key, value in row.items():
+            if key not in ("layer", "content", "type", "created", "body"):
+                values.setdefault(key, value)
+
+        created = parse_created(row.get("created"))
+        values["date"] = created.strftime("%Y-%m-%d")
+        values["timestamp"] = created.strftime("%Y%m%d%H%M%S")
+        values["corpus_dir"] = str(self.corpus_dir)
+
+        template = self._template(template_name)
+        text = template.render(values).rstrip("\n") + "\n"
+        if row.get("body"):
+            text += "\n" + str(row["body"]).rstrip("\n") + "\n"
+
+        target_dir = self.corpus_dir / spec.path
+        if CITATION_PATTERN.match(citation_key):
+            # 文献笔记以引用键命名（rel_@key.md，与库中已有文献一致），每个引用键只建一篇
+            name = f"{layer}_@{safe_filename(citation_key[1:])}.md"
+            if name in self._taken_names(target_dir):
+                raise ValueError(f"{citation_key} already exists: {name}")
+            names = iter([name])
+        else:
+            stem = f"{layer}_{safe_filename(content)}" if content else layer
+            names = self._candidate_names(target_dir, stem, include_date, created)
+
+        if dry_run:
+            taken = self._taken_names(target_dir)
+            name = next(n for n in names if n not in taken)
+            taken.add(name)
+            return target_dir / name
+
+        target_dir.mkdir(parents=True, exist_ok=True)
+        path = self._write_atomic(target_dir, names, text)
+        if path is None:
+            raise ValueError(f"{citation_key} already exists: {name}")
+        return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corpus Bulk Note Creation')
+    parser.add_argument('manifest',
+                       help='CSV (with header) or JSONL manifest; fields: '
+                            'layer, content, status, type, created, body, '
+                            'citation_key, title, author, journal, year, doi')
+    parser.add_argument('--status',
+                       help="Status for rows without one (default: the template's status)")
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Show the files that would be created')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Only print errors and the summary')
+    parser.add_argument('--corpus-dir',
+                       help='Override CORPUS_DIR environment variable')
+
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus_dir or os.environ.get('CORPUS_DIR')
+    if not corpus_dir or not Path(corpus_dir).is_dir():
+        print("Error: CORPUS_DIR not set or not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        rows = read_manifest(args.manifest)
+        creator = BulkCreator(corpus_dir, default_status=args.status)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    created = errors = 0
+    for line_no, row in rows:
+        try:
+            path = creator.create(row, dry_run=args.dry_run)
+        except (OSError, ValueError) as e:
+            errors += 1
+            print(f"Error: {Path(args.manifest).name}:{line_no}: {e}", file=sys.stderr)
+            continue
+        created += 1
+        if not args.quiet:
+            print(path.relative_to(creator.corpus_dir).as_posix())
+    elapsed = time.perf_counter() - start
+
+    action = "Would create" if args.dry_run else "Created"
+    rate = created / elapsed if elapsed > 0 else 0
+    print(f"{action} {created} note(s) in {elapsed:.2f}s ({rate:.0f} notes/s), "
+          f"{errors} error(s)", file=sys.stderr)
+
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
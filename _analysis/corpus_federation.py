@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# _analysis/corpus_federation.py
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from corpus_results import AnalysisResult
+from corpus_summarizer import CorpusSummarizer
+
+
+def vault_names(corpus_dirs):
+    """各 Corpus 的显示名：目录名，重名时附加上级目录"""
+    names = [Path(d).name for d in corpus_dirs]
+    for i, corpus_dir in enumerate(corpus_dirs):
+        if names.count(names[i]) > 1:
+            names[i] = "/".join(Path(corpus_dir).parts[-2:])
+    return names
+
+
+def _analyze_vault(job):
+    """worker：完整分析单个 Corpus"""
+    corpus_dir, start_date, end_date, layers, network_top_k, use_git = job
+    summarizer = CorpusSummarizer(corpus_dir, network_top_k=network_top_k)
+    if use_git and not summarizer.load_git_history():
+        print(f"Warning: --git ignored for {corpus_dir}, not in a git work tree", file=sys.stderr)
+    return summarizer.analyze_period(start_date, end_date, layers)
+
+
+def analyze_vaults(corpus_dirs, start_date, end_date, layers=None,
+                   network_top_k=50, use_git=False, jobs=None):
+    """每个 Corpus 一个进程并行分析，合并为一份结果
+
+    返回 (summarizer, results)：summarizer 用于渲染报告（层级表取自第一个
+    Corpus），results 中 vaults 为分库明细，警告带 [Corpus 名] 前缀。
+    """
+    tasks = [
+        (corpus_dir, start_date, end_date, layers, network_top_k, use_git)
+        for corpus_dir in corpus_dirs
+    ]
+    if len(tasks) == 1 or jobs == 1:
+        outcomes = list(map(_analyze_vault, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs or len(tasks)) as executor:
+            outcomes = list(executor.map(_analyze_vault, tasks))
+
+    results = AnalysisResult.empty(start_date, end_date)
+    for name, outcome in zip(vault_names(corpus_dirs), outcomes):
+        results.merge(outcome, name)
+
+    # 派生指标基于合并后的数据重新计算
+    summarizer = CorpusSummarizer(corpus_dirs[0], network_top_k=network_top_k)
+    summarizer._analyze_patterns(results)
+    summarizer._analyze_network(results)
+    return summarizer, results
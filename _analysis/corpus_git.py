@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# _analysis/corpus_git.py
+
+import subprocess
+from pathlib import Path
+
+
+class GitError(RuntimeError):
+    pass
+
+
+class GitChangeFeed:
+    """以 git 作为变更来源：提交间差异、工作区状态与文件首次提交时间
+
+    所有路径均相对于 corpus_dir（Corpus 可以是仓库的子目录）。
+    """
+
+    def __init__(self, corpus_dir):
+        self.corpus_dir = Path(corpus_dir)
+        self._prefix = None
+
+    def _git(self, *args):
+        try:
+            result = subprocess.run(
+                ["git", "-c", "core.quotepath=off", "-C", str(self.corpus_dir), *args],
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                check=False,
+            )
+        except OSError as e:
+            raise GitError(f"git not available: {e}")
+        if result.returncode != 0:
+            raise GitError(result.stderr.strip() or f"git {args[0]} failed")
+        return result.stdout
+
+    def is_available(self):
+        try:
+            self._git("rev-parse", "--is-inside-work-tree")
+            return True
+        except GitError:
+            return False
+
+    @property
+    def prefix(self):
+        """corpus_dir 相对仓库根目录的前缀"""
+        if self._prefix is None:
+            self._prefix = self._git("rev-parse", "--show-prefix").strip()
+        return self._prefix
+
+    def _relative(self, path):
+        return path[len(self.prefix) :] if path.startswith(self.prefix) else None
+
+    def head(self):
+        """当前 HEAD 提交，空仓库时返回 None"""
+        try:
+            return self._git("rev-parse", "--verify", "-q", "HEAD").strip() or None
+        except GitError:
+            return None
+
+    def has_commit(self, commit):
+        try:
+            self._git("cat-file", "-e", f"{commit}^{{commit}}")
+            return True
+        except GitError:
+            return False
+
+    def changed_since(self, commit):
+        """自 commit 以来（含工作区）变化的路径，返回 (changed, deleted)"""
+        changed, deleted = set(), set()
+
+        head = self.head()
+        if commit and head and commit != head:
+            fields = self._git(
+                "diff", "--name-status", "-z", "--no-renames", "--relative",
+                commit, head, "--",
+            ).split("\0")
+            for status, path in zip(fields[0::2], fields[1::2]):
+                (deleted if status.startswith("D") else changed).add(path)
+
+        # 工作区与暂存区（含未跟踪文件）
+        fields = iter(
+            self._git(
+                "status", "--porcelain", "-z", "--untracked-files=all", "--", "."
+            ).split("\0")
+        )
+        for field in fields:
+            if len(field) < 4:
+                continue
+            status, path = field[:2], self._relative(field[3:])
+            if "R" in status or "C" in status:
+                # 重命名条目后跟原路径
+                source = self._relative(next(fields, ""))
+                if source:
+                    deleted.add(source)
+            if path is None:
+                continue
+            if "D" in status:
+                deleted.add(path)
+            else:
+                changed.add(path)
+
+        changed -= deleted
+        return changed, deleted
+
+    def first_commit_times(self, paths=None):
+        """文件首次被提交的时间（epoch 秒）；一次 git log 获取全部，指定路径时分批"""
+        if self.head() is None:
+            # 尚无提交的仓库（git log 会失败）
+            return {}
+        if paths is None:
+            return self._first_commit_times([])
+
+        paths = sorted(paths)
+        times = {}
+        for i in range(0, len(paths), 500):
+            times.update(self._first_commit_times(paths[i : i + 500]))
+        return times
+
+    def _first_commit_times(self, pathspecs):
+        output = self._git(
+            "log", "--reverse", "--diff-filter=A", "--no-renames", "--relative",
+            "--format=%x01%ct", "--name-only", "--", *pathspecs,
+        )
+        times = {}
+        timestamp = None
+        for line in output.splitlines():
+            if line.startswith("\x01"):
+                timestamp = int(line[1:])
+            elif line and timestamp is not None:
+                times.setdefault(line, timestamp)
+        return times
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# _analysis/corpus_index.py
+
+import json
+import os
+from pathlib import Path
+
+from corpus_api import Note, extract_body, extract_frontmatter
+from corpus_archive import CorpusArchive
+from corpus_summarizer import CorpusSummarizer
+
+
+class MetadataIndex:
+    """笔记元数据索引：只在文件变化时重新解析，结果缓存于 _sum
+
+    提供 git（GitChangeFeed）时，以上次索引的提交与 HEAD 之间的差异及
+    工作区状态作为变更来源，不依赖 checkout 后失真的 mtime；无日期文件
+    的创建时间取首次提交时间，一并缓存。
+
+    已归档（_archive）的笔记以归档时记录的元数据入索引，标记 archived，
+    不解压正文。
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, corpus_dir, summarizer=None, git=None):
+        self.corpus_dir = Path(corpus_dir)
+        self.summarizer = summarizer or CorpusSummarizer(self.corpus_dir)
+        self.cache_path = self.corpus_dir / "_sum" / ".corpus_index.json"
+        self.git = git
+        self.archive = CorpusArchive(self.corpus_dir)
+        # relpath -> record
+        self.records = {}
+        # 上次索引时的提交、relpath -> 首次提交时间（epoch 秒）与上次的变更路径
+        self.git_head = None
+        self.git_created = {}
+        self.git_pending = []
+
+    def load(self):
+        """加载缓存的索引"""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != self.CACHE_VERSION:
+            return False
+        self.records = data.get("records", {})
+        self.git_head = data.get("git_head")
+        self.git_created = data.get("git_created", {})
+        self.git_pending = data.get("git_pending", [])
+        return True
+
+    def save(self):
+        """保存索引到 _sum 目录"""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": self.CACHE_VERSION,
+                    "records": self.records,
+                    "git_head": self.git_head,
+                    "git_created": self.git_created,
+                    "git_pending": self.git_pending,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self):
+        """增量更新索引，返回变化的文件数"""
+        if self.git is None:
+            return self._refresh_from_stat() + self._sync_archive()
+
+        if self.git_head and self.git.has_commit(self.git_head):
+            changed = self._refresh_from_git()
+        else:
+            # 首次建立：一次 git log 取得全部首次提交时间
+            self.git_created = self.git.first_commit_times()
+            self.summarizer.git_created = self.git_created
+            changed = self._refresh_from_stat() + self._apply_git_created()
+        self.git_head = self.git.head()
+        return changed + self._sync_archive()
+
+    def _apply_git_created(self):
+        """首次取得 git 首次提交时间后，更新未重新解析的无日期笔记的创建时间"""
+        updated = 0
+        for relpath, record in self.records.items():
+            if record.get("archived") or relpath not in self.git_created:
+                continue
+            created = Note(self.summarizer.corpus, relpath, record["layer"]).created
+            created = created.isoformat(timespec="seconds") if created else None
+            if created != record["created"]:
+                record["created"] = created
+                updated += 1
+        return updated
+
+    def _sync_archive(self):
+        """以归档索引中的元数据同步已归档笔记的记录"""
+        synced = 0
+        entries = self.archive.entries
+        for relpath, entry in entries.items():
+            # 已有记录：已同步的归档记录，或磁盘上仍有（或被还原的）同一文件
+            if relpath in self.records:
+                continue
+            self.records[relpath] = dict(entry["metadata"], archived=True)
+            synced += 1
+
+        # 已还原的笔记内容与 mtime 不变，只需去掉标记
+        for relpath, record in list(self.records.items()):
+            if record.get("archived") and relpath not in entries:
+                if (self.corpus_dir / relpath).exists():
+                    del record["archived"]
+                else:
+                    del self.records[relpath]
+                synced += 1
+        return synced
+
+    def _refresh_from_stat(self):
+        """按 mtime/size 判断变化"""
+        parsed = 0
+        seen = set()
+
+        for entry, layer_key in self.summarizer.walker.walk():
+            filepath = Path(entry.path)
+            relpath = filepath.relative_to(self.corpus_dir).as_posix()
+            seen.add(relpath)
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            record = self.records.get(relpath)
+            if (
+                record
+                and record["mtime_ns"] == stat.st_mtime_ns
+                and record["size"] == stat.st_size
+            ):
+                continue
+
+            try:
+                self.records[relpath] = self._parse(filepath, layer_key, stat)
+            except (OSError, UnicodeDecodeError):
+                continue
+            parsed += 1
+
+        removed = [
+            relpath
+            for relpath, record in self.records.items()
+            if relpath not in seen and not record.get("archived")
+        ]
+        for relpath in removed:
+            del self.records[relpath]
+
+        return parsed + len(removed)
+
+    def _refresh_from_git(self):
+        """只重新解析 git 报告变化的笔记"""
+        changed, deleted = self.git.changed_since(self.git_head)
+        # 上次未提交的改动可能已被还原，需要重新检查
+        pending = set(self.git_pending)
+        self.git_pending = sorted(changed | deleted)
+        changed |= pending - deleted
+
+        for relpath in deleted:
+            self.records.pop(relpath, None)
+            self.git_created.pop(relpath, None)
+
+        new_paths = [p for p in changed if p not in self.git_created]
+        self.git_created.update(self.git.first_commit_times(new_paths))
+        self.summarizer.git_created = self.git_created
+
+        parsed = 0
+        for relpath in changed:
+            layer_key = self.summarizer.walker.resolve(relpath)
+            if layer_key is None:
+                continue
+            filepath = self.corpus_dir / relpath
+            try:
+                stat = filepath.stat()
+                self.records[relpath] = self._parse(filepath, layer_key, stat)
+            except (OSError, UnicodeDecodeError):
+                self.records.pop(relpath, None)
+                continue
+            parsed += 1
+
+        return parsed + len(deleted)
+
+    def _parse(self, filepath, layer_key, stat):
+        """读取并解析单篇笔记的元数据"""
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+        return self.describe(filepath, content, layer_key, stat)
+
+    def describe(self, filepath, content, layer_key, stat):
+        """由笔记内容生成元数据记录"""
+        frontmatter = extract_frontmatter(content)
+        if not isinstance(frontmatter, dict):
+            frontmatter = {}
+        body_content = extract_body(content)
+        relpath = Path(filepath).relative_to(self.corpus_dir).as_posix()
+        created = Note(self.summarizer.corpus, relpath, layer_key, str(filepath)).created
+        last_modified = frontmatter.get("last_modified")
+
+        return {
+            "layer": layer_key,
+            "status": str(frontmatter.get("status") or "unknown"),
+            "created": created.isoformat(timespec="seconds") if created else None,
+            "last_modified": str(last_modified) if last_modified else None,
+            "word_count": len(body_content.split()),
+            "citation_key": frontmatter.get("citation_key"),
+            "year": _as_int(frontmatter.get("year")),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# _analysis/corpus_layers.py
+
+import re
+from collections import namedtuple
+from pathlib import Path
+
+LayerSpec = namedtuple(
+    "LayerSpec",
+    "category full_name alias path description requires_arg include_date",
+)
+
+
+def load_layer_table(corpus_dir):
+    """从 corpus 脚本的 CORPUS_LAYERS_DATA 读取层级表，返回 {alias: LayerSpec}"""
+    script_path = Path(corpus_dir) / "corpus"
+    with open(script_path, "r", encoding="utf-8") as f:
+        script = f.read()
+
+    match = re.search(r"CORPUS_LAYERS_DATA='(.*?)'", script, re.S)
+    if not match:
+        raise ValueError(f"CORPUS_LAYERS_DATA not found in {script_path}")
+
+    layers = {}
+    for line in match.group(1).splitlines():
+        fields = line.strip().split("|")
+        if len(fields) != 7:
+            continue
+        category, full_name, alias, path, description, requires_arg, include_date = fields
+        layers[alias] = LayerSpec(
+            category,
+            full_name,
+            alias,
+            path,
+            description,
+            requires_arg == "true",
+            include_date == "true",
+        )
+    return layers
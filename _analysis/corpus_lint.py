@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# _analysis/corpus_lint.py
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+
+import yaml
+
+from corpus_api import parse_frontmatter
+from corpus_layers import load_layer_table
+from corpus_walker import CorpusWalker
+
+# 已知状态值（summarizer 报告与 corpus help 中出现的全部状态）
+KNOWN_STATUSES = {"probe", "draft", "form", "evergreen", "canon", "archive", "void"}
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# 少于该数量的待检查文件直接在当前进程处理，避免进程池启动开销
+POOL_THRESHOLD = 64
+
+
+def load_schemas(corpus_dir):
+    """从 _template/tp_*.md 推导每个层级的 frontmatter 模式"""
+    schemas = {}
+    for template_path in sorted(Path(corpus_dir, "_template").glob("tp_*.md")):
+        with open(template_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        frontmatter = parse_frontmatter(content, placeholders=True)
+        if not isinstance(frontmatter, dict) or "layer" not in frontmatter:
+            continue
+
+        schema = {
+            "template": template_path.name,
+            "layer": frontmatter["layer"],
+            "required": sorted(frontmatter),
+            "dates": sorted(
+                key for key, value in frontmatter.items() if value == "{{date}}"
+            ),
+        }
+        full_name = frontmatter["layer"].split("/")[-1]
+        variant = frontmatter.get("type", "")
+        schemas[f"{full_name}:{variant}"] = schema
+    return schemas
+
+
+def lint_note(content, layer_spec, schemas):
+    """检查单篇笔记，返回 [(level, message)]"""
+    issues = []
+    try:
+        frontmatter = parse_frontmatter(content, placeholders=True)
+    except yaml.YAMLError as e:
+        return [("error", f"invalid frontmatter: {str(e).splitlines()[0]}")]
+
+    if frontmatter is None:
+        return [("error", "missing frontmatter")]
+    if not isinstance(frontmatter, dict):
+        return [("error", "frontmatter is not a mapping")]
+
+    variant = str(frontmatter.get("type") or "")
+    schema = schemas.get(f"{layer_spec.full_name}:{variant}") or schemas.get(
+        f"{layer_spec.full_name}:"
+    )
+
+    # 必填字段
+    required = schema["required"] if schema else ["created", "layer", "status"]
+    missing = [key for key in required if key not in frontmatter]
+    if missing:
+        issues.append(("error", f"missing fields: {', '.join(missing)}"))
+
+    # 层级一致性：声明值须为模板层级路径的前缀（如 autopsia 之于 autopsia/incisio）
+    declared = frontmatter.get("layer")
+    if declared is not None:
+        declared = str(declared).strip("/")
+        if schema:
+            expected = schema["layer"]
+        else:
+            expected = f"{layer_spec.category}/{layer_spec.full_name}"
+        expected_parts = expected.split("/")
+        declared_parts = declared.split("/")
+        if declared_parts != expected_parts[: len(declared_parts)]:
+            issues.append(("error", f"layer '{declared}' does not match '{expected}'"))
+
+    # 状态值
+    status = frontmatter.get("status")
+    if status is not None and not isinstance(status, str):
+        issues.append(("error", f"status {status!r} is not a string"))
+    elif status is not None and status not in KNOWN_STATUSES:
+        issues.append(("warning", f"unknown status '{status}'"))
+
+    # 日期格式
+    date_fields = schema["dates"] if schema else ["created", "last_modified"]
+    dates = {}
+    for key in date_fields:
+        value = frontmatter.get(key)
+        if value is None:
+            continue
+        if isinstance(value, datetime):
+            value = value.date()
+        if isinstance(value, date):
+            dates[key] = value
+        elif not DATE_PATTERN.match(str(value)):
+            issues.append(("error", f"{key} '{value}' is not YYYY-MM-DD"))
+        else:
+            # 加引号的日期（如 "2025-01-05"）被 YAML 解析为字符串
+            try:
+                dates[key] = date.fromisoformat(value)
+            except ValueError:
+                issues.append(("error", f"{key} '{value}' is not a valid date"))
+
+    if "created" in dates and "last_modified" in dates:
+        if dates["last_modified"] < dates["created"]:
+            issues.append(("warning", "last_modified is earlier than created"))
+
+    # Reliquia 文献字段
+    if layer_spec.alias == "rel" and variant == "paper":
+        citation_key = str(frontmatter.get("citation_key") or "")
+        if not citation_key:
+            issues.append(("error", "paper without citation_key"))
+        elif not re.match(r"^@[\w-]+$", citation_key):
+            issues.append(("warning", f"citation_key '{citation_key}' is not @key"))
+        for key in ("title", "author", "year"):
+            if key in frontmatter and not frontmatter[key]:
+                issues.append(("warning", f"paper has empty {key}"))
+        year = frontmatter.get("year")
+        if year and not re.match(r"^\d{4}$", str(year)):
+            issues.append(("warning", f"year '{year}' is not a 4-digit year"))
+
+    return issues
+
+
+# 进程池 worker 共享的层级表与模式
+_worker_state = {}
+
+
+def _init_worker(layers, schemas):
+    _worker_state["layers"] = layers
+    _worker_state["schemas"] = schemas
+
+
+def _lint_file(job):
+    """worker：读取文件并计算哈希，内容变化时才检查（返回 issues 为 None 表示未变）"""
+    filepath, layer_key, cached_digest = job
+    try:
+        with open(filepath, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        return None, [("error", f"cannot read file: {e}")]
+
+    digest = hashlib.sha1(raw).hexdigest()
+    if digest == cached_digest:
+        return digest, None
+    try:
+        content = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return digest, [("error", "file is not valid UTF-8")]
+
+    layer_spec = _worker_state["layers"][layer_key]
+    return digest, lint_note(content, layer_spec, _worker_state["schemas"])
+
+
+class CorpusLinter:
+    """全库 frontmatter / 层级检查，按文件哈希缓存结果"""
+
+    CACHE_VERSION = 2
+
+    def __init__(self, corpus_dir, jobs=None):
+        self.corpus_dir = Path(corpus_dir)
+        self.jobs = jobs
+        self.cache_path = self.corpus_dir / "_sum" / ".lint_cache.json"
+        self.layers = load_layer_table(self.corpus_dir)
+        self.schemas = load_schemas(self.corpus_dir)
+        self.walker = CorpusWalker(
+            self.corpus_dir, {alias: spec.path for alias, spec in self.layers.items()}
+        )
+        self.schema_hash = hashlib.sha1(
+            json.dumps(
+                [self.layers, self.schemas], sort_keys=True, default=str
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (
+            cache.get("version") != self.CACHE_VERSION
+            or cache.get("schema_hash") != self.schema_hash
+        ):
+            return {}
+        return cache.get("files", {})
+
+    def _save_cache(self, files):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": self.CACHE_VERSION,
+                    "schema_hash": self.schema_hash,
+                    "files": files,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.cache_path)
+
+    def lint(self, use_cache=True):
+        """检查全部笔记，返回 ({relpath: [(level, message)]}, 重新检查的文件数)"""
+        cached = self._load_cache() if use_cache else {}
+        files = {}
+        pending = []
+
+        for entry, layer_key in self.walker.walk():
+            relpath = Path(entry.path).relative_to(self.corpus_dir).as_posix()
+            stat = entry.stat()
+            record = cached.get(relpath)
+            if (
+                record
+                and record["mtime_ns"] == stat.st_mtime_ns
+                and record["size"] == stat.st_size
+            ):
+                files[relpath] = record
+                continue
+            files[relpath] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha1": record["sha1"] if record else None,
+                "issues": record["issues"] if record else [],
+            }
+            pending.append((relpath, (entry.path, layer_key, files[relpath]["sha1"])))
+
+        relinted = 0
+        if pending:
+            jobs = [job for _, job in pending]
+            if len(pending) < POOL_THRESHOLD or self.jobs == 1:
+                _init_worker(self.layers, self.schemas)
+                outcomes = list(map(_lint_file, jobs))
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=self.jobs,
+                    initializer=_init_worker,
+                    initargs=(self.layers, self.schemas),
+                ) as executor:
+                    outcomes = list(executor.map(_lint_file, jobs, chunksize=64))
+
+            for (relpath, _), (digest, issues) in zip(pending, outcomes):
+                record = files[relpath]
+                record["sha1"] = digest
+                # 内容未变（仅 mtime 变化）时沿用缓存结果
+                if issues is not None:
+                    record["issues"] = [list(issue) for issue in issues]
+                    relinted += 1
+
+        if use_cache:
+            if pending or len(files) != len(cached):
+                self._save_cache(files)
+
+        results = {
+            relpath: [tuple(issue) for issue in record["issues"]]
+            for relpath, record in sorted(files.items())
+        }
+        return results, relinted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corpus Frontmatter Linter')
+    parser.add_argument('--format', default='standard',
+                       choices=['standard', 'json'])
+    parser.add_argument('--jobs', type=int,
+                       help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-check every note and leave the cache untouched')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Only print errors')
+    parser.add_argument('--corpus-dir',
+                       help='Override CORPUS_DIR environment variable')
+
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus_dir or os.environ.get('CORPUS_DIR')
+    if not corpus_dir or not Path(corpus_dir).is_dir():
+        print("Error: CORPUS_DIR not set or not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        linter = CorpusLinter(corpus_dir, jobs=args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot load layer table: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    results, relinted = linter.lint(use_cache=not args.no_cache)
+
+    if args.format == 'json':
+        print(json.dumps(
+            {relpath: [{"level": level, "message": message}
+                       for level, message in issues]
+             for relpath, issues in results.items() if issues},
+            ensure_ascii=False, indent=2,
+        ))
+    else:
+        for relpath, issues in results.items():
+            shown = [i for i in issues if not args.quiet or i[0] == "error"]
+            if not shown:
+                continue
+            print(relpath)
+            for level, message in shown:
+                marker = "✗" if level == "error" else "!"
+                print(f"  {marker} {message}")
+
+    error_count = sum(
+        1 for issues in results.values() for level, _ in issues if level == "error"
+    )
+    warning_count = sum(
+        1 for issues in results.values() for level, _ in issues if level == "warning"
+    )
+    if not args.quiet and args.format != 'json':
+        print(
+            f"\n{len(results)} notes checked ({relinted} re-linted): "
+            f"{error_count} error(s), {warning_count} warning(s)"
+        )
+
+    if error_count:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
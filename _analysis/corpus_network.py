@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# _analysis/corpus_network.py
+
+import math
+from collections import Counter, defaultdict
+from itertools import combinations
+
+# 候选概念数为 top_k 的倍数（按文档频率截断，限制共现计算的开销）
+CANDIDATE_FACTOR = 4
+# 出现在超过该比例笔记中的概念与任何概念的 lift 都不超过 1/MAX_DF，不作为候选
+MAX_DF = 0.5
+# 社群划分时每个概念只保留关联最强的若干条边
+MAX_NEIGHBOURS = 5
+
+
+def build_cooccurrence(note_concepts, top_k=50, min_count=3):
+    """计算概念共现网络：按关联度（lift）排序的概念对与概念社群
+
+    note_concepts 为每篇笔记的概念集合（或 Counter）。共现矩阵等价于
+    笔记×概念关联矩阵 A 的乘积 AᵀA，只在截断后的候选词表上按笔记累加。
+    lift = N·c(a,b) / (df(a)·df(b))，相互独立的概念约为 1；共现次数少于
+    min_count 的概念对不计入。网络取 lift 最高的概念对中的前 top_k 个概念。
+    """
+    note_concepts = [set(concepts) for concepts in note_concepts]
+    total = len(note_concepts)
+
+    doc_freq = Counter()
+    for concepts in note_concepts:
+        doc_freq.update(concepts)
+
+    candidates = [
+        term
+        for term, df in doc_freq.most_common()
+        if min_count <= df <= MAX_DF * total
+    ][: CANDIDATE_FACTOR * top_k]
+    index = {term: i for i, term in enumerate(candidates)}
+
+    pair_counts = Counter()
+    for concepts in note_concepts:
+        ids = sorted(index[term] for term in concepts if term in index)
+        pair_counts.update(combinations(ids, 2))
+
+    scored = []
+    for (a, b), count in pair_counts.items():
+        if count < min_count:
+            continue
+        lift = total * count / (doc_freq[candidates[a]] * doc_freq[candidates[b]])
+        if lift > 1:
+            scored.append((candidates[a], candidates[b], count, lift))
+    scored.sort(key=lambda edge: (-edge[3], -edge[2], edge[0], edge[1]))
+
+    # 按关联度依次纳入概念，直到 top_k 个
+    vocab = {}
+    for a, b, _, _ in scored:
+        if len(vocab) >= top_k:
+            break
+        for term in (a, b):
+            vocab.setdefault(term, doc_freq[term])
+
+    edges = [edge for edge in scored if edge[0] in vocab and edge[1] in vocab]
+    return {
+        "vocab": vocab,
+        "pairs": edges,
+        "communities": detect_communities(prune_edges(edges)),
+    }
+
+
+def prune_edges(edges, max_neighbours=MAX_NEIGHBOURS):
+    """保留每个概念关联最强的 max_neighbours 条边，权重取 log(lift)
+
+    edges 需已按 lift 降序排列。
+    """
+    degree = Counter()
+    pruned = []
+    for a, b, count, lift in edges:
+        if degree[a] < max_neighbours or degree[b] < max_neighbours:
+            pruned.append((a, b, count, math.log(lift)))
+        degree[a] += 1
+        degree[b] += 1
+    return pruned
+
+
+def detect_communities(edges, max_rounds=20):
+    """加权标签传播划分概念社群（权重取边的第四项），返回按规模排序的社群列表"""
+    neighbours = defaultdict(dict)
+    for a, b, _, weight in edges:
+        neighbours[a][b] = weight
+        neighbours[b][a] = weight
+
+    nodes = sorted(neighbours)
+    labels = {node: node for node in nodes}
+
+    for _ in range(max_rounds):
+        changed = False
+        for node in nodes:
+            scores = Counter()
+            for neighbour, weight in neighbours[node].items():
+                scores[labels[neighbour]] += weight
+            # 平局时取字典序最小的标签，保证结果确定
+            best = min(scores.items(), key=lambda item: (-item[1], item[0]))[0]
+            if best != labels[node]:
+                labels[node] = best
+                changed = True
+        if not changed:
+            break
+
+    groups = defaultdict(list)
+    for node, label in labels.items():
+        groups[label].append(node)
+
+    communities = [sorted(group) for group in groups.values() if len(group) > 1]
+    communities.sort(key=lambda group: (-len(group), group[0]))
+    return communities
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# _analysis/corpus_query.py
+
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from corpus_git import GitChangeFeed
+from corpus_index import MetadataIndex
+
+# 查询字段 -> 记录字段
+FIELDS = {
+    "path": "path",
+    "layer": "layer",
+    "status": "status",
+    "created": "created",
+    "modified": "last_modified",
+    "last_modified": "last_modified",
+    "words": "word_count",
+    "word_count": "word_count",
+    "citation": "citation_key",
+    "citation_key": "citation_key",
+    "year": "year",
+    "age": "age",
+    "archived": "archived",
+}
+NUMERIC_FIELDS = {"word_count", "year", "age"}
+
+TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) | (?P<comma>,) |
+        (?P<op><=|>=|!=|==|=|<|>|~) |
+        "(?P<dquote>[^"]*)" | '(?P<squote>[^']*)' |
+        (?P<word>[^\s(),<>=!~"']+)
+    )""",
+    re.X,
+)
+
+
+class QueryError(ValueError):
+    pass
+
+
+# -----------------------
+# 过滤表达式解析
+# -----------------------
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if not match or match.end() == pos:
+            raise QueryError(f"unexpected input at: {text[pos:]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind in ("dquote", "squote"):
+            tokens.append(("value", value))
+        elif kind == "op":
+            tokens.append(("op", "=" if value == "==" else value))
+        elif kind == "word":
+            lowered = value.lower()
+            if lowered in ("and", "or", "not", "in"):
+                tokens.append((lowered, lowered))
+            else:
+                tokens.append(("value", value))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """expr := or；or := and ("or" and)*；and := not ("and" not)*；
+    not := "not" not | "(" expr ")" | field op value | field "in" "(" values ")"
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self, kind):
+        if self.peek() != kind:
+            found = self.tokens[self.pos][1] if self.pos < len(self.tokens) else "end"
+            raise QueryError(f"expected {kind}, found {found!r}")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token[1]
+
+    def parse(self):
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise QueryError(f"unexpected {self.tokens[self.pos][1]!r}")
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.peek() == "or":
+            self.take("or")
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and(self):
+        nodes = [self.parse_not()]
+        while self.peek() == "and":
+            self.take("and")
+            nodes.append(self.parse_not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_not(self):
+        if self.peek() == "not":
+            self.take("not")
+            return ("not", self.parse_not())
+        if self.peek() == "lparen":
+            self.take("lparen")
+            node = self.parse_or()
+            self.take("rparen")
+            return node
+
+        name = self.take("value").lower()
+        if name not in FIELDS:
+            raise QueryError(f"unknown field {name!r} (known: {', '.join(sorted(FIELDS))})")
+        field = FIELDS[name]
+
+        if self.peek() == "in":
+            self.take("in")
+            self.take("lparen")
+            values = [_coerce(field, self.take("value"))]
+            while self.peek() == "comma":
+                self.take("comma")
+                values.append(_coerce(field, self.take("value")))
+            self.take("rparen")
+            return ("in", field, values)
+
+        op = self.take("op")
+        return ("cmp", field, op, _coerce(field, self.take("value")))
+
+
+def _coerce(field, value):
+    """把字面量转换为字段对应的类型（年龄支持 60d / 8w / 1y）"""
+    if field == "age":
+        match = re.match(r"^(\d+)([dwy]?)$", value)
+        if not match:
+            raise QueryError(f"invalid age {value!r}, use e.g. 60d, 8w, 1y")
+        return int(match.group(1)) * {"": 1, "d": 1, "w": 7, "y": 365}[match.group(2)]
+    if field == "archived":
+        if value.lower() not in ("yes", "no", "true", "false"):
+            raise QueryError(f"archived expects yes/no, got {value!r}")
+        return value.lower() in ("yes", "true")
+    if field in NUMERIC_FIELDS:
+        try:
+            return int(value)
+        except ValueError:
+            raise QueryError(f"{field} expects a number, got {value!r}")
+    return value
+
+
+def parse_query(text):
+    if not text or not text.strip():
+        return None
+    return _Parser(tokenize(text)).parse()
+
+
+# -----------------------
+# 查询执行
+# -----------------------
+class QueryEngine:
+    """基于元数据索引与二级索引（层级、状态、创建时间）的结构化查询"""
+
+    def __init__(self, records, now=None):
+        self.now = now or datetime.now()
+        self.paths = sorted(records)
+        self.records = []
+        self.by_layer = {}
+        self.by_status = {}
+        created = []
+
+        for i, path in enumerate(self.paths):
+            record = dict(records[path], path=path)
+            self.records.append(record)
+            self.by_layer.setdefault(record["layer"], set()).add(i)
+            self.by_status.setdefault(record["status"], set()).add(i)
+            if record.get("created"):
+                created.append((record["created"], i))
+
+        created.sort()
+        self.created_keys = [key for key, _ in created]
+        self.created_ids = [i for _, i in created]
+
+    def _created_range(self, low=None, high=None, low_inclusive=True, high_inclusive=True):
+        """创建时间区间内的记录 id（ISO 字符串可直接按字典序比较）"""
+        keys = self.created_keys
+        if low is None:
+            start = 0
+        elif low_inclusive:
+            start = bisect.bisect_left(keys, low)
+        else:
+            start = bisect.bisect_right(keys, low)
+        if high is None:
+            end = len(keys)
+        elif high_inclusive:
+            end = bisect.bisect_right(keys, high)
+        else:
+            end = bisect.bisect_left(keys, high)
+        return set(self.created_ids[start:end])
+
+    def _candidates(self, node):
+        """由二级索引给出候选集合；无法使用索引时返回 None（需全表扫描）"""
+        kind = node[0]
+        if kind == "and":
+            sets = [s for s in (self._candidates(child) for child in node[1]) if s is not None]
+            if not sets:
+                return None
+            sets.sort(key=len)
+            result = set(sets[0])
+            for other in sets[1:]:
+                result &= other
+            return result
+        if kind == "or":
+            sets = [self._candidates(child) for child in node[1]]
+            if any(s is None for s in sets):
+                return None
+            return set().union(*sets)
+        if kind == "in":
+            _, field, values = node
+            index = {"layer": self.by_layer, "status": self.by_status}.get(field)
+            if index is None:
+                return None
+            return set().union(*(index.get(v, set()) for v in values))
+        if kind == "cmp":
+            _, field, op, value = node
+            index = {"layer": self.by_layer, "status": self.by_status}.get(field)
+            if index is not None and op == "=":
+                return set(index.get(value, set()))
+            if field == "created" and op in ("<", "<=", ">", ">=", "="):
+                bound = value if "T" in value else None
+                day_start, day_end = value, value + "T23:59:59"
+                if op == "=":
+                    return self._created_range(day_start, bound or day_end)
+                if op == "<":
+                    return self._created_range(high=day_start, high_inclusive=False)
+                if op == "<=":
+                    return self._created_range(high=bound or day_end)
+                if op == ">":
+                    return self._created_range(low=bound or day_end, low_inclusive=False)
+                return self._created_range(low=day_start)
+            if field == "age" and op in ("<", "<=", ">", ">="):
+                # 年龄按整天计（与 _value 一致）：age >= N ⇔ created <= now - N 天，
+                # age > N 即 age >= N + 1；保留微秒使边界与逐条比较完全一致
+                days = value + 1 if op in (">", "<=") else value
+                cutoff = (self.now - timedelta(days=days)).isoformat()
+                if op in (">", ">="):
+                    return self._created_range(high=cutoff)
+                return self._created_range(low=cutoff, low_inclusive=False)
+        return None
+
+    def _value(self, record, field):
+        if field == "age":
+            if not record.get("created"):
+                return None
+            return (self.now - datetime.fromisoformat(record["created"])).days
+        if field == "archived":
+            return bool(record.get("archived"))
+        return record.get(field)
+
+    def _matches(self, node, record):
+        kind = node[0]
+        if kind == "and":
+            return all(self._matches(child, record) for child in node[1])
+        if kind == "or":
+            return any(self._matches(child, record) for child in node[1])
+        if kind == "not":
+            return not self._matches(node[1], record)
+        if kind == "in":
+            return self._value(record, node[1]) in node[2]
+
+        _, field, op, value = node
+        actual = self._value(record, field)
+        if op == "~":
+            return actual is not None and str(value).lower() in str(actual).lower()
+        if op == "=":
+            if field == "created" and actual and "T" not in value:
+                return actual[:10] == value
+            return actual == value
+        if op == "!=":
+            return actual != value
+        if actual is None:
+            return False
+        if field == "created" and "T" not in value:
+            # 日期粒度比较
+            actual = actual[:10]
+        try:
+            if op == "<":
+                return actual < value
+            if op == "<=":
+                return actual <= value
+            if op == ">":
+                return actual > value
+            return actual >= value
+        except TypeError:
+            return False
+
+    def run(self, node, sort="created", limit=None):
+        """执行查询，返回记录列表"""
+        if node is None:
+            ids = range(len(self.records))
+        else:
+            candidates = self._candidates(node)
+            ids = range(len(self.records)) if candidates is None else candidates
+            ids = [i for i in ids if self._matches(node, self.records[i])]
+
+        descending = sort.startswith("-")
+        field = FIELDS.get(sort.lstrip("-"))
+        if field is None:
+            raise QueryError(f"unknown sort field {sort.lstrip('-')!r}")
+
+        rows = [self.records[i] for i in ids]
+        # None 值总排在最后
+        present = [r for r in rows if self._value(r, field) is not None]
+        missing = [r for r in rows if self._value(r, field) is None]
+        present.sort(key=lambda r: self._value(r, field), reverse=descending)
+        rows = present + missing
+        return rows[:limit] if limit else rows
+
+
+def format_table(rows):
+    if not rows:
+        return "No matching notes."
+    lines = [f"{'CREATED':<19}  {'LAYER':<5} {'STATUS':<10} {'WORDS':>6}  PATH"]
+    for r in rows:
+        created = (r.get("created") or "-").replace("T", " ")
+        lines.append(
+            f"{created:<19}  {r['layer']:<5} {r['status']:<10} {r['word_count']:>6}  {r['path']}"
+        )
+    lines.append(f"\n{len(rows)} note(s)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corpus Metadata Query')
+    parser.add_argument('filter', nargs='?', default='',
+                       help='Filter expression, e.g. '
+                            '"layer in (nod, hal) and status = probe and age > 60d and words < 100"')
+    parser.add_argument('--sort', default='created',
+                       help='Sort field, prefix with - for descending (default: created)')
+    parser.add_argument('--limit', type=int,
+                       help='Maximum number of results')
+    parser.add_argument('--format', default='table',
+                       choices=['table', 'json'])
+    parser.add_argument('--git', action='store_true',
+                       help='Use git history for change detection and creation times of undated notes')
+    parser.add_argument('--no-refresh', action='store_true',
+                       help='Answer from the cached index without checking for changed notes')
+    parser.add_argument('--corpus-dir',
+                       help='Override CORPUS_DIR environment variable')
+
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus_dir or os.environ.get('CORPUS_DIR')
+    if not corpus_dir or not Path(corpus_dir).is_dir():
+        print("Error: CORPUS_DIR not set or not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        node = parse_query(args.filter)
+    except QueryError as e:
+        print(f"Error: invalid query: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    git = None
+    if args.git:
+        git = GitChangeFeed(corpus_dir)
+        if not git.is_available():
+            print("Warning: --git ignored, CORPUS_DIR is not in a git work tree", file=sys.stderr)
+            git = None
+
+    index = MetadataIndex(corpus_dir, git=git)
+    loaded = index.load()
+    if not args.no_refresh or not loaded:
+        if index.refresh() or not loaded:
+            index.save()
+
+    engine = QueryEngine(index.records)
+    try:
+        rows = engine.run(node, sort=args.sort, limit=args.limit)
+    except QueryError as e:
+        print(f"Error: invalid query: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.format == 'json':
+        print(json.dumps(
+            [{k: v for k, v in r.items() if k not in ("mtime_ns", "size")} for r in rows],
+            ensure_ascii=False, indent=2,
+        ))
+    else:
+        print(format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# _analysis/corpus_results.py
+
+from collections import Counter, defaultdict
+
+from corpus_temporal import TemporalProfile
+
+
+class AnalysisResult(dict):
+    """analyze_period 的结果：保持 dict 接口，可与其他 Corpus 的结果合并
+
+    合并只累加原始数据（层级文件、状态、概念、时间分布、字数）；峰值时段、
+    创作速度与概念网络等派生指标需在合并后重新计算。
+    """
+
+    @classmethod
+    def empty(cls, start_date, end_date):
+        return cls(
+            period={
+                "start": start_date,
+                "end": end_date,
+                "days": (end_date - start_date).days + 1,
+            },
+            layers=defaultdict(list),
+            status_dist=Counter(),
+            time_patterns={"profile": TemporalProfile(start_date, end_date)},
+            concepts=Counter(),
+            concept_network={},
+            warnings=[],
+            metadata={"total_files": 0, "total_words": 0},
+        )
+
+    def summary(self):
+        """单个 Corpus 的概要（用于分库明细）"""
+        return {
+            "total_files": self["metadata"]["total_files"],
+            "total_words": self["metadata"]["total_words"],
+            "avg_words": self["metadata"].get("avg_words", 0),
+            "velocity": self["time_patterns"].get("velocity", 0),
+            "layers": {key: len(files) for key, files in self["layers"].items() if files},
+            "status_dist": dict(self["status_dist"]),
+            "top_concepts": self["concepts"].most_common(5),
+            "warnings": list(self["warnings"]),
+        }
+
+    def merge(self, other, name=None):
+        """把另一份结果并入当前结果；name 给出时记录分库明细并为警告加前缀"""
+        period, other_period = self["period"], other["period"]
+        period["start"] = min(period["start"], other_period["start"])
+        period["end"] = max(period["end"], other_period["end"])
+        period["days"] = (period["end"] - period["start"]).days + 1
+
+        for key, files in other["layers"].items():
+            self["layers"][key].extend(files)
+        self["status_dist"].update(other["status_dist"])
+        self["concepts"].update(other["concepts"])
+        self["time_patterns"]["profile"].merge(other["time_patterns"]["profile"])
+
+        prefix = f"[{name}] " if name else ""
+        self["warnings"].extend(prefix + warning for warning in other["warnings"])
+
+        self["metadata"]["total_files"] += other["metadata"]["total_files"]
+        self["metadata"]["total_words"] += other["metadata"]["total_words"]
+
+        vaults = self.setdefault("vaults", {})
+        if name:
+            vaults[name] = other.summary()
+        else:
+            vaults.update(other.get("vaults", {}))
+        return self
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# _analysis/corpus_sampling.py
+
+import math
+import random
+import time
+from collections import Counter, defaultdict
+
+from corpus_results import AnalysisResult
+
+# 95% 置信水平对应的正态分位数
+Z_95 = 1.96
+# 报告中给出置信区间的概念数
+TOP_CONCEPTS = 10
+
+
+def _mean_var(values):
+    """样本均值与（无偏）样本方差"""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0
+    mean = sum(values) / n
+    if n < 2:
+        return mean, 0.0
+    return mean, sum((v - mean) ** 2 for v in values) / (n - 1)
+
+
+def stratified_total(samples, sizes):
+    """分层抽样的总体总量估计及其方差
+
+    samples: 层级 -> 样本值列表；sizes: 层级 -> 总体笔记数。样本不足 2 个
+    的层级借用全部样本的合并方差，未抽到的层级以合并均值外推。
+    """
+    pooled_mean, pooled_var = _mean_var([v for vals in samples.values() for v in vals])
+
+    total = variance = 0.0
+    for layer, size in sizes.items():
+        values = samples.get(layer, ())
+        n = len(values)
+        if n == 0:
+            total += size * pooled_mean
+            variance += size * size * pooled_var
+            continue
+        mean, var = _mean_var(values)
+        if n < 2:
+            var = pooled_var
+        total += size * mean
+        # 有限总体校正
+        variance += size * size * (1 - n / size) * var / n
+    return total, variance
+
+
+def approximate_period(summarizer, start_date, end_date, layers=None,
+                       sample_rate=0.05, time_budget=None, seed=None):
+    """按层级分层随机抽样，只解析样本并外推全体统计（附 95% 置信区间）
+
+    笔记数、层级分布与时间分布来自目录列表，是精确值；字数、状态与概念为
+    估计值。time_budget（秒）耗尽时停止抽样，但每个层级至少解析一篇。
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    results = AnalysisResult.empty(start_date, end_date)
+    profile = results["time_patterns"]["profile"]
+
+    # 目录列表：不打开任何笔记
+    for note in summarizer._list_period(start_date, end_date, layers):
+        file_info = summarizer._file_info(note)
+        results["layers"][note.layer].append(file_info)
+        profile.add(file_info["created"], note.layer)
+
+    sizes = {key: len(files) for key, files in results["layers"].items()}
+    population = sum(sizes.values())
+    results["metadata"]["total_files"] = population
+
+    # 各层按比例确定样本量，交错排列：预算中途耗尽时各层仍近似按比例
+    queue = []
+    for layer_key, files in results["layers"].items():
+        files.sort(key=lambda x: x["created"])
+        target = min(len(files), max(1, math.ceil(sample_rate * len(files))))
+        for i, file_info in enumerate(rng.sample(files, target)):
+            priority = (i + rng.random()) / target if i else rng.random() - 1
+            queue.append((priority, file_info))
+    queue.sort(key=lambda item: item[0])
+
+    # 只解析样本
+    sample = AnalysisResult.empty(start_date, end_date)
+    sampled = defaultdict(list)
+    exhausted = False
+    for priority, file_info in queue:
+        if (
+            time_budget is not None
+            and priority >= 0
+            and time.perf_counter() - started > time_budget
+        ):
+            exhausted = True
+            break
+        summarizer._extract_metadata(file_info, sample)
+        if "word_count" in file_info:
+            sampled[file_info["layer"]].append(file_info)
+    results["warnings"].extend(sample["warnings"])
+
+    sample_size = sum(len(files) for files in sampled.values())
+    approximation = {
+        "confidence": 0.95,
+        "population": population,
+        "sample_size": sample_size,
+        "sample_rate": sample_size / population if population else 0.0,
+        "budget_exhausted": exhausted,
+        "strata": {key: [len(sampled.get(key, ())), size] for key, size in sizes.items()},
+    }
+
+    if sample_size:
+        # 字数
+        total_words, variance = stratified_total(
+            {key: [f["word_count"] for f in files] for key, files in sampled.items()},
+            sizes,
+        )
+        margin = Z_95 * math.sqrt(variance)
+        results["metadata"]["total_words"] = round(total_words)
+        approximation["total_words"] = [total_words, margin]
+        approximation["avg_words"] = [total_words / population, margin / population]
+
+        # 状态占比
+        statuses = {f["status"] for files in sampled.values() for f in files}
+        shares = []
+        for status in statuses:
+            total, variance = stratified_total(
+                {
+                    key: [1 if f["status"] == status else 0 for f in files]
+                    for key, files in sampled.items()
+                },
+                sizes,
+            )
+            results["status_dist"][status] = round(total)
+            shares.append([status, total / population, Z_95 * math.sqrt(variance) / population])
+        shares.sort(key=lambda item: item[1], reverse=True)
+        approximation["status"] = shares
+
+        # 概念频次：全部样本概念按层级权重外推，前若干位给出置信区间
+        for key, files in sampled.items():
+            weight = sizes[key] / len(files)
+            for f in files:
+                for concept, count in f["concepts"].items():
+                    results["concepts"][concept] += count * weight
+        results["concepts"] = Counter(
+            {concept: round(total) for concept, total in results["concepts"].items()}
+        )
+        ranked = []
+        for concept, _ in results["concepts"].most_common(TOP_CONCEPTS):
+            total, variance = stratified_total(
+                {
+                    key: [f["concepts"].get(concept, 0) for f in files]
+                    for key, files in sampled.items()
+                },
+                sizes,
+            )
+            ranked.append([concept, total, Z_95 * math.sqrt(variance)])
+        approximation["concepts"] = ranked
+
+    summarizer._analyze_patterns(results)
+    summarizer._analyze_network(results)
+    summarizer._generate_warnings(results)
+
+    approximation["elapsed"] = time.perf_counter() - started
+    results["approximation"] = approximation
+    return results
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# _analysis/corpus_similarity.py
+
+import argparse
+import heapq
+import json
+import math
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+from corpus_api import extract_body, extract_concepts
+from corpus_archive import ArchiveError
+from corpus_summarizer import CorpusSummarizer
+
+
+# 文档数相对 IDF 计算时变化超过该比例时，全部重新计算 IDF 与范数
+IDF_DRIFT = 0.1
+# 单个词的 IDF 变化超过该比例时才更新，并重算含该词文档的范数
+IDF_TOLERANCE = 0.01
+
+
+class SimilarityIndex:
+    """基于 TF-IDF 稀疏向量的相似笔记索引
+
+    倒排表只记录词频（与 IDF 无关），IDF 与文档范数单独保存：文档增删只
+    修改涉及的倒排链，IDF 变化只需重算含该词文档的范数。倒排链与词频向量
+    以紧凑字符串缓存，只有查询或更新涉及的部分才会解析，加载成本与文档数
+    而非倒排总长度成正比。
+    """
+
+    CACHE_VERSION = 2
+
+    def __init__(self, corpus_dir, summarizer=None, max_query_terms=32):
+        self.corpus_dir = Path(corpus_dir)
+        self.summarizer = summarizer or CorpusSummarizer(self.corpus_dir)
+        self.cache_path = self.corpus_dir / "_sum" / ".similarity_index.json"
+        self.max_query_terms = max_query_terms
+
+        # relpath -> [id, mtime_ns, layer, 范数, "term:count ..."]
+        self.docs = {}
+        # id -> relpath（已删除的文档为 None，全量重算时不回收）
+        self.paths = []
+        # 文档频率（增量维护）与 IDF（计算时的文档数为 n_ref）
+        self.doc_freq = Counter()
+        self.idf = {}
+        self.n_ref = 0
+
+        # term -> "id:count ..."（缓存原文）/ {id: count}（已解析）
+        self._postings_raw = {}
+        self._postings = {}
+        # 本次更新中文档频率变化的词与需要计算范数的新文档
+        self._df_changed = set()
+        self._new_docs = set()
+
+    # -----------------------
+    # 缓存持久化
+    # -----------------------
+    def load(self):
+        """加载缓存的索引"""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get("version") != self.CACHE_VERSION:
+            return False
+
+        self.docs = data["docs"]
+        self.paths = [None] * data["next_id"]
+        for relpath, doc in self.docs.items():
+            self.paths[doc[0]] = relpath
+        self.doc_freq = Counter(data["doc_freq"])
+        self.idf = data["idf"]
+        self.n_ref = data["n_ref"]
+        self._postings_raw = data["postings"]
+        self._postings = {}
+        return True
+
+    def save(self):
+        """保存索引到 _sum 目录"""
+        postings = self._postings_raw
+        for term, posting in self._postings.items():
+            postings[term] = " ".join(f"{i}:{c}" for i, c in posting.items())
+        self._postings = {}
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": self.CACHE_VERSION,
+                    "next_id": len(self.paths),
+                    "n_ref": self.n_ref,
+                    "docs": self.docs,
+                    "doc_freq": self.doc_freq,
+                    "idf": self.idf,
+                    "postings": postings,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.cache_path)
+
+    # -----------------------
+    # 增量更新
+    # -----------------------
+    def _read_concepts(self, filepath):
+        """读取笔记并提取概念计数"""
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+        return self._concepts(content)
+
+    def _concepts(self, content):
+        return extract_concepts(extract_body(content))
+
+    def _posting(self, term):
+        """term 的倒排链 {id: count}（首次访问时解析）"""
+        posting = self._postings.get(term)
+        if posting is None:
+            raw = self._postings_raw.pop(term, "")
+            posting = self._postings[term] = {}
+            for item in raw.split():
+                doc_id, _, count = item.partition(":")
+                posting[int(doc_id)] = int(count)
+        return posting
+
+    def _add_doc(self, relpath, mtime_ns, layer, concepts):
+        doc_id = len(self.paths)
+        self.paths.append(relpath)
+        tf = {term: count for term, count in concepts.items() if count > 0}
+        self.docs[relpath] = [
+            doc_id,
+            mtime_ns,
+            layer,
+            0.0,
+            " ".join(f"{term}:{count}" for term, count in tf.items()),
+        ]
+        for term, count in tf.items():
+            self._posting(term)[doc_id] = count
+        self.doc_freq.update(tf.keys())
+        self._df_changed.update(tf.keys())
+        self._new_docs.add(relpath)
+
+    def _remove_doc(self, relpath):
+        doc = self.docs.pop(relpath, None)
+        if doc is None:
+            return
+        doc_id = doc[0]
+        self.paths[doc_id] = None
+        self._new_docs.discard(relpath)
+        for term in _parse_tf(doc[4]):
+            posting = self._posting(term)
+            posting.pop(doc_id, None)
+            self.doc_freq[term] -= 1
+            if self.doc_freq[term] <= 0:
+                del self.doc_freq[term]
+                del self._postings[term]
+                self.idf.pop(term, None)
+            else:
+                self._df_changed.add(term)
+
+    def refresh(self):
+        """按文件修改时间增量更新索引，返回 (新增, 更新, 删除) 数量"""
+        added = updated = 0
+        seen = set()
+        prefix_len = len(str(self.corpus_dir)) + 1
+
+        for entry, layer_key in self.summarizer.walker.walk():
+            relpath = entry.path[prefix_len:].replace(os.sep, "/")
+            seen.add(relpath)
+            try:
+                mtime_ns = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+
+            doc = self.docs.get(relpath)
+            if doc is not None and doc[1] == mtime_ns:
+                continue
+
+            try:
+                concepts = self._read_concepts(entry.path)
+            except (OSError, UnicodeDecodeError):
+                continue
+
+            if doc is not None:
+                self._remove_doc(relpath)
+                updated += 1
+            else:
+                added += 1
+            self._add_doc(relpath, mtime_ns, layer_key, concepts)
+
+        # 已归档的笔记内容不再变化，只在首次出现时解压一次
+        archive = self.summarizer.archive
+        for relpath, entry in archive.entries.items():
+            if relpath in seen:
+                continue
+            seen.add(relpath)
+            if relpath in self.docs:
+                continue
+            try:
+                concepts = self._concepts(archive.read_text(relpath))
+            except (OSError, UnicodeDecodeError, ArchiveError):
+                continue
+            added += 1
+            self._add_doc(
+                relpath, entry["mtime_ns"], entry["metadata"]["layer"], concepts
+            )
+
+        removed = [relpath for relpath in self.docs if relpath not in seen]
+        for relpath in removed:
+            self._remove_doc(relpath)
+
+        self._update_weights()
+        return added, updated, len(removed)
+
+    # -----------------------
+    # 向量化
+    # -----------------------
+    def _idf_value(self, df):
+        """平滑 IDF（文档数取计算时的 n_ref）"""
+        return math.log((1 + self.n_ref) / (1 + df)) + 1
+
+    def _update_weights(self):
+        """更新 IDF 与文档范数：只处理文档频率变化的词及含这些词的文档"""
+        n_docs = len(self.docs)
+        if not self.n_ref or abs(n_docs - self.n_ref) > IDF_DRIFT * self.n_ref:
+            # 文档数变化较大（或首次建立）：全部重新计算
+            self.n_ref = n_docs
+            self.idf = {term: self._idf_value(df) for term, df in self.doc_freq.items()}
+            stale = self.docs.keys()
+        else:
+            stale = set(self._new_docs)
+            for term in self._df_changed:
+                df = self.doc_freq.get(term)
+                if not df:
+                    continue
+                idf = self._idf_value(df)
+                old = self.idf.get(term)
+                if old is None or abs(idf - old) > IDF_TOLERANCE * old:
+                    self.idf[term] = idf
+                    stale.update(self.paths[i] for i in self._posting(term))
+
+        idf = self.idf
+        log = math.log
+        for relpath in stale:
+            doc = self.docs[relpath]
+            doc[3] = math.sqrt(
+                sum(
+                    ((1 + log(count)) * idf[term]) ** 2
+                    for term, count in _parse_tf(doc[4]).items()
+                )
+            )
+
+        self._df_changed = set()
+        self._new_docs = set()
+
+    def query(self, concepts, k=10, layers=None, exclude=None):
+        """余弦相似度 top-k 查询，返回 [(score, relpath, layer)]"""
+        log = math.log
+        weights = {
+            term: (1 + log(count)) * self.idf.get(term, self._idf_value(0))
+            for term, count in concepts.items()
+            if count > 0
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if norm == 0:
+            return []
+
+        # 只保留权重最高的查询词，限制需要遍历的倒排链
+        query_terms = heapq.nlargest(
+            self.max_query_terms, weights.items(), key=lambda item: item[1]
+        )
+
+        scores = {}
+        tf_weight = {}
+        for term, weight in query_terms:
+            if term not in self.idf:
+                continue
+            factor = weight / norm * self.idf[term]
+            for doc_id, count in self._posting(term).items():
+                w = tf_weight.get(count)
+                if w is None:
+                    w = tf_weight[count] = 1 + log(count)
+                scores[doc_id] = scores.get(doc_id, 0.0) + factor * w
+
+        results = []
+        for doc_id, score in scores.items():
+            relpath = self.paths[doc_id]
+            doc = self.docs[relpath]
+            if relpath == exclude or not doc[3]:
+                continue
+            if layers and doc[2] not in layers:
+                continue
+            results.append((score / doc[3], relpath, doc[2]))
+        return heapq.nlargest(k, results, key=lambda item: item[0])
+
+    def query_text(self, text, k=10, layers=None):
+        """以任意文本查询相似笔记"""
+        return self.query(extract_concepts(text), k, layers)
+
+    def query_note(self, filepath, k=10, layers=None):
+        """以已有笔记查询相似笔记（排除自身）"""
+        filepath = Path(filepath).resolve()
+        try:
+            relpath = filepath.relative_to(self.corpus_dir.resolve()).as_posix()
+        except ValueError:
+            relpath = None
+        if relpath in self.summarizer.archive and not filepath.exists():
+            concepts = self._concepts(self.summarizer.archive.read_text(relpath))
+        else:
+            concepts = self._read_concepts(filepath)
+        return self.query(concepts, k, layers, exclude=relpath)
+
+
+def _parse_tf(text):
+    """解析 "term:count ..." 形式的词频向量"""
+    tf = {}
+    for item in text.split():
+        term, _, count = item.rpartition(":")
+        tf[term] = int(count)
+    return tf
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corpus Related Notes')
+    parser.add_argument('target',
+                       help='Path to an existing note, or free text to match')
+    parser.add_argument('--top', type=int, default=10,
+                       help='Number of related notes to show')
+    parser.add_argument('--layer',
+                       help='Filter by layer (comma-separated): inc,pat,sat,frag,rel,...')
+    parser.add_argument('--format', default='standard',
+                       choices=['standard', 'json'])
+    parser.add_argument('--rebuild', action='store_true',
+                       help='Ignore the cached index and rebuild it')
+    parser.add_argument('--corpus-dir',
+                       help='Override CORPUS_DIR environment variable')
+
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus_dir or os.environ.get('CORPUS_DIR')
+    if not corpus_dir or not Path(corpus_dir).is_dir():
+        print("Error: CORPUS_DIR not set or not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    layers = None
+    if args.layer:
+        layers = [l.strip() for l in args.layer.split(",")]
+
+    index = SimilarityIndex(corpus_dir)
+    if not args.rebuild:
+        index.load()
+    added, updated, removed = index.refresh()
+    if added or updated or removed:
+        index.save()
+
+    if Path(args.target).is_file():
+        related = index.query_note(args.target, args.top, layers)
+    elif (Path(corpus_dir) / args.target).is_file():
+        # 相对 CORPUS_DIR 的笔记路径（在 Corpus 目录外运行时）
+        related = index.query_note(Path(corpus_dir) / args.target, args.top, layers)
+    elif args.target in index.summarizer.archive:
+        # 已归档笔记以相对 CORPUS_DIR 的路径指定
+        related = index.query_note(Path(corpus_dir) / args.target, args.top, layers)
+    else:
+        related = index.query_text(args.target, args.top, layers)
+
+    if args.format == 'json':
+        print(json.dumps(
+            [{"score": round(score, 4), "path": relpath, "layer": layer}
+             for score, relpath, layer in related],
+            ensure_ascii=False, indent=2,
+        ))
+        return
+
+    if not related:
+        print("No related notes found.")
+        return
+
+    print("RELATED NOTES:")
+    for score, relpath, layer in related:
+        print(f"  {score:.3f}  {layer:<5} {relpath}")
+
+
+if __name__ == "__main__":
+    main()
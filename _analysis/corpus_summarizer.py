@@ -5,47 +5,33 @@ import os
 import re
 import sys
 from datetime import datetime, timedelta
-from collections import defaultdict, Counter
-import yaml
+from collections import defaultdict
 import argparse
 from pathlib import Path
 
+from corpus_api import Corpus
+from corpus_layers import load_layer_table
+from corpus_network import build_cooccurrence
+from corpus_results import AnalysisResult
+from corpus_temporal import DAY_NAMES
+
 
 class CorpusSummarizer:
-    def __init__(self, corpus_dir):
-        # self.corpus_dir = Path(corpus_dir)
-        self.corpus_dir = corpus_dir
-
-        # 精确的层级映射（基于实际目录结构）
-        self.layer_map = {
-            # Autopsia 自省
-            "inc": "000_autopsia/010_incisio",
-            "pat": "000_autopsia/020_pathologia",
-            "sat": "000_autopsia/030_satura",
-            # Ingesta 摄取
-            "frag": "100_ingesta/110_fragmenta",
-            "rel": "100_ingesta/120_reliquia",
-            "imp": "100_ingesta/130_impressio",
-            "org": "100_ingesta/140_organon",
-            "tox": "100_ingesta/150_toxicon",
-            # Neoplasma 增生
-            "cor": "200_neoplasma/210_cor",
-            "vas": "200_neoplasma/220_vascula",
-            "aby": "200_neoplasma/230_oblivium/231_abyssus",
-            "nod": "200_neoplasma/230_oblivium/232_nodus",
-            "hal": "200_neoplasma/230_oblivium/233_hallucina",
-            "flu": "200_neoplasma/230_oblivium/234_fluxus",
-            "fra": "200_neoplasma/230_oblivium/235_fractura",
-            "chi": "200_neoplasma/230_oblivium/236_chimera",
-            "eru": "200_neoplasma/240_eruptio",
-            # Putredo 腐朽
-            "mia": "300_putredo/310_miasma",
-            "ulc": "300_putredo/320_ulcus",
-            "exh": "300_putredo/330_exhumatio",
-            # 特殊层级
-            "del": "400_delirium",
-            "vig": "500_vigil",
-        }
+    def __init__(self, corpus_dir, network_top_k=50):
+        self.corpus_dir = Path(corpus_dir)
+        # 概念共现网络的词表规模上限
+        self.network_top_k = network_top_k
+        # 笔记枚举与按需解析（层级映射、遍历、归档、解析缓存）
+        self.corpus = Corpus(self.corpus_dir)
+        self.layer_map = self.corpus.layer_map
+        self.walker = self.corpus.walker
+        self.archive = self.corpus.archive
+
+        # corpus 脚本中的层级表（用于 frontmatter 层级一致性校验）
+        try:
+            self.layer_table = load_layer_table(self.corpus_dir)
+        except (OSError, ValueError):
+            self.layer_table = {}
 
         # 层级组织
         self.major_layers = {
@@ -92,131 +78,120 @@ class CorpusSummarizer:
             "vig": "Vigil - 夜间守望",
         }
 
+    @property
+    def git_created(self):
+        """relpath -> git 首次提交时间，由 MetadataIndex 在 --git 模式下填充"""
+        return self.corpus.git_created
+
+    @git_created.setter
+    def git_created(self, value):
+        self.corpus.git_created = value
+
+    def load_git_history(self):
+        """以 git 首次提交时间作为无日期笔记的创建时间，不在仓库中时返回 False
+
+        首次提交时间缓存于元数据索引（按 git 变更增量更新）；报告所需的内容
+        （状态、字数、概念）仍逐篇读取时间段内的笔记。
+        """
+        from corpus_git import GitChangeFeed
+        from corpus_index import MetadataIndex
+
+        git = GitChangeFeed(self.corpus_dir)
+        if not git.is_available():
+            return False
+        index = MetadataIndex(self.corpus_dir, self, git=git)
+        index.load()
+        if index.refresh():
+            index.save()
+        self.git_created = index.git_created
+        return True
+
     def analyze_period(self, start_date, end_date, layers=None):
         """分析指定时间段的Corpus活动"""
-        results = {
-            "period": {
-                "start": start_date,
-                "end": end_date,
-                "days": (end_date - start_date).days + 1,
-            },
-            "layers": defaultdict(list),
-            "status_dist": Counter(),
-            "time_patterns": {"creation_hours": [], "creation_days": []},
-            "concepts": Counter(),
-            "warnings": [],
-            "metadata": {"total_files": 0, "total_words": 0},
-        }
+        results = AnalysisResult.empty(start_date, end_date)
 
-        for layer_key, layer_path in self.layer_map.items():
-            if layers and layer_key not in layers:
+        files_by_layer = self._get_files_in_period(start_date, end_date, layers)
+        for layer_key in self.layer_map:
+            files = files_by_layer.get(layer_key)
+            if not files:
                 continue
+            results["layers"][layer_key] = files
 
-            full_path = self.corpus_dir / layer_path
-            if full_path.exists():
-                files = self._get_files_in_period(full_path, start_date, end_date)
-                results["layers"][layer_key] = files
-
-                # 处理每个文件的元数据
-                for file_info in files:
-                    self._extract_metadata(file_info, results)
-                    results["metadata"]["total_files"] += 1
+            # 处理每个文件的元数据
+            for file_info in files:
+                self._extract_metadata(file_info, results)
+                results["metadata"]["total_files"] += 1
 
         self._analyze_patterns(results)
+        self._analyze_network(results)
         self._generate_warnings(results)
         return results
 
-    def _get_files_in_period(self, path, start_date, end_date):
-        """获取时间段内的文件"""
-        files = []
-        if not path.exists():
-            return files
+    def _get_files_in_period(self, start_date, end_date, layers=None):
+        """获取时间段内的文件（递归遍历全部层级，按层级分组）"""
+        files_by_layer = defaultdict(list)
 
-        for filepath in path.glob("*.md"):
-            # 跳过模板文件
-            if filepath.name.startswith("tp_"):
-                continue
+        for note in self._list_period(start_date, end_date, layers):
+            files_by_layer[note.layer].append(self._file_info(note))
 
-            # 从文件名或文件时间获取创建时间
-            file_time = self._extract_creation_time(filepath)
-
-            if file_time and start_date <= file_time <= end_date:
-                files.append(
-                    {
-                        "path": filepath,
-                        "filename": filepath.name,
-                        "created": file_time,
-                        "layer": self._get_layer_from_path(str(path)),
-                    }
-                )
+        for files in files_by_layer.values():
+            files.sort(key=lambda x: x["created"])
+        return files_by_layer
 
-        return sorted(files, key=lambda x: x["created"])
-
-    def _extract_creation_time(self, filepath):
-        """从文件名或文件属性提取创建时间"""
-        filename = filepath.name
-
-        # 方法1: 从文件名提取时间戳（如 cmd_name_20241029123456.md）
-        timestamp_match = re.search(r"(\d{14})", filename)
-        if timestamp_match:
-            try:
-                return datetime.strptime(timestamp_match.group(1), "%Y%m%d%H%M%S")
-            except ValueError:
-                pass
-
-        # 方法2: 从文件名提取日期（如 cmd_name_20241029.md）
-        date_match = re.search(r"(\d{8})", filename)
-        if date_match:
-            try:
-                return datetime.strptime(date_match.group(1), "%Y%m%d")
-            except ValueError:
-                pass
-
-        # 方法3: 使用文件的修改时间
-        try:
-            return datetime.fromtimestamp(filepath.stat().st_mtime)
-        except OSError:
-            return None
+    def _list_period(self, start_date, end_date, layers=None):
+        """列出时间段内的笔记（含已归档），只读取目录与归档索引，不打开笔记"""
+        return self.corpus.notes(layers, start_date, end_date)
+
+    def _file_info(self, note):
+        return {
+            "note": note,
+            "filename": note.filename,
+            "created": note.created,
+            "layer": note.layer,
+        }
 
     def _get_layer_from_path(self, path):
         """从路径推断层级"""
-        for key, layer_path in self.layer_map.items():
-            if layer_path in path:
-                return key
-        return "unknown"
+        try:
+            path = Path(path).relative_to(self.corpus_dir)
+        except ValueError:
+            pass
+        return self.walker.trie.resolve(path) or "unknown"
 
     def _extract_metadata(self, file_info, results):
         """提取文件元数据和内容分析"""
+        note = file_info["note"]
         try:
-            with open(file_info["path"], "r", encoding="utf-8") as f:
-                content = f.read()
+            # 读取笔记（一次 mtime 检查），解析 YAML frontmatter
+            content = note.read()
+            frontmatter = content.frontmatter
 
             # 记录时间模式
-            results["time_patterns"]["creation_hours"].append(file_info["created"].hour)
-            results["time_patterns"]["creation_days"].append(
-                file_info["created"].weekday()
+            results["time_patterns"]["profile"].add(
+                file_info["created"], file_info["layer"]
             )
 
-            # 解析 YAML frontmatter
-            frontmatter = self._extract_frontmatter(content)
             if frontmatter:
                 if "status" in frontmatter:
                     results["status_dist"][frontmatter["status"]] += 1
-                if "layer" in frontmatter:
-                    # 验证层级一致性
-                    declared_layer = frontmatter["layer"].split("/")[-1]
-                    if declared_layer != file_info["layer"]:
+                layer_spec = self.layer_table.get(file_info["layer"])
+                if "layer" in frontmatter and layer_spec:
+                    # 验证层级一致性（声明值末段应为层级全名或所属大类）
+                    declared_layer = str(frontmatter["layer"]).split("/")[-1]
+                    if declared_layer not in (
+                        layer_spec.full_name,
+                        layer_spec.category,
+                    ):
                         results["warnings"].append(
                             f"层级不一致: {file_info['filename']}"
                         )
 
             # 内容分析
-            body_content = self._extract_body_content(content)
-            word_count = len(body_content.split())
+            word_count = content.word_count
             results["metadata"]["total_words"] += word_count
 
-            # 概念提取（改进版）
-            concepts = self._extract_concepts(body_content)
+            # 概念提取
+            concepts = content.concepts
             results["concepts"].update(concepts)
 
             # 存储文件详细信息
@@ -233,80 +208,21 @@ class CorpusSummarizer:
                 f"文件读取错误 {file_info['filename']}: {str(e)}"
             )
 
-    def _extract_frontmatter(self, content):
-        """提取YAML frontmatter"""
-        if content.startswith("---"):
-            try:
-                yaml_end = content.find("---", 3)
-                if yaml_end != -1:
-                    frontmatter_text = content[3:yaml_end].strip()
-                    return yaml.safe_load(frontmatter_text)
-            except yaml.YAMLError:
-                pass
-        return {}
-
-    def _extract_body_content(self, content):
-        """提取正文内容（去除frontmatter）"""
-        if content.startswith("---"):
-            yaml_end = content.find("---", 3)
-            if yaml_end != -1:
-                return content[yaml_end + 3 :].strip()
-        return content
-
-    def _extract_concepts(self, content):
-        """提取关键概念（改进的NLP处理）"""
-        # 移除标点和特殊字符，转为小写
-        clean_content = re.sub(r"[^\w\s\u4e00-\u9fff]", " ", content.lower())
-
-        # 提取有意义的词汇（长度>=2）
-        words = re.findall(r"[\w\u4e00-\u9fff]{2,}", clean_content)
-
-        # 过滤常用词（可以扩展stopwords列表）
-        stopwords = {
-            "the",
-            "and",
-            "or",
-            "but",
-            "in",
-            "on",
-            "at",
-            "to",
-            "for",
-            "of",
-            "with",
-            "by",
-            "是",
-            "的",
-            "了",
-            "在",
-            "和",
-            "与",
-            "或者",
-            "但是",
-            "因为",
-            "所以",
-            "这个",
-            "那个",
-        }
-
-        meaningful_words = [w for w in words if w not in stopwords and len(w) >= 2]
-
-        return Counter(meaningful_words)
-
     def _analyze_patterns(self, results):
         """分析活动模式"""
-        if results["time_patterns"]["creation_hours"]:
+        profile = results["time_patterns"]["profile"]
+        if profile.total:
             # 活跃时段分析
-            hour_dist = Counter(results["time_patterns"]["creation_hours"])
-            results["time_patterns"]["peak_hours"] = hour_dist.most_common(3)
+            results["time_patterns"]["peak_hours"] = profile.peak_hours(3)
 
             # 活跃日期分析
-            day_names = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
-            day_dist = Counter(results["time_patterns"]["creation_days"])
             results["time_patterns"]["active_days"] = [
-                (day_names[day], count) for day, count in day_dist.most_common(3)
+                (DAY_NAMES[day], count) for day, count in profile.active_days(3)
             ]
 
+            # 各层级连续创作与间隔
+            results["time_patterns"]["layer_streaks"] = profile.layer_streaks()
+
             # 创作速度
             total_entries = results["metadata"]["total_files"]
             period_days = results["period"]["days"]
@@ -318,6 +234,21 @@ class CorpusSummarizer:
                     results["metadata"]["total_words"] / total_entries
                 )
 
+    def _analyze_network(self, results):
+        """分析概念共现网络"""
+        note_concepts = [
+            file_info["concepts"]
+            for files in results["layers"].values()
+            for file_info in files
+            if file_info.get("concepts")
+        ]
+        if len(note_concepts) < 2:
+            return
+
+        results["concept_network"] = build_cooccurrence(
+            note_concepts, top_k=self.network_top_k
+        )
+
     def _generate_warnings(self, results):
         """生成健康度警告"""
         total_entries = results["metadata"]["total_files"]
@@ -374,7 +305,12 @@ class CorpusSummarizer:
         elif format_type == "json":
             import json
 
-            return json.dumps(results, default=str, ensure_ascii=False, indent=2)
+            return json.dumps(
+                results,
+                default=lambda o: o.to_dict() if hasattr(o, "to_dict") else str(o),
+                ensure_ascii=False,
+                indent=2,
+            )
         else:
             return self._generate_standard_report(results)
 
@@ -390,6 +326,8 @@ class CorpusSummarizer:
         report.append(
             f"Period: {period['start'].strftime('%Y-%m-%d')} → {period['end'].strftime('%Y-%m-%d')} ({period['days']} days)"
         )
+        if results.get("vaults"):
+            report.append(f"Vaults: {' | '.join(results['vaults'])}")
         report.append("")
 
         # 概览统计
@@ -455,6 +393,27 @@ class CorpusSummarizer:
                 report.append(f"  Most Active Days: {' | '.join(active_days)}")
             report.append("")
 
+            profile = results["time_patterns"]["profile"]
+            report.append("  Hour × Weekday:")
+            report.extend(profile.render_hour_weekday())
+            report.append("")
+            report.append("  Calendar:")
+            report.extend(profile.render_calendar())
+            report.append("")
+
+            streaks = results["time_patterns"].get("layer_streaks", {})
+            if streaks:
+                report.append("  Layer Rhythm (active days / longest streak / longest gap):")
+                for key in self.layer_map:
+                    if key in streaks:
+                        stat = streaks[key]
+                        desc = self.layer_descriptions.get(key, key.upper())
+                        report.append(
+                            f"    └─ {desc}: {stat['active_days']}d / "
+                            f"{stat['longest_streak']}d / {stat['longest_gap']}d"
+                        )
+                report.append("")
+
         # 概念热点
         if results["concepts"]:
             report.append("CONCEPTUAL HOTSPOTS:")
@@ -469,6 +428,77 @@ class CorpusSummarizer:
                     report.append(f"  {' | '.join(concept_lines[i:i+5])}")
                 report.append("")
 
+        # 概念网络
+        network = results.get("concept_network") or {}
+        if network.get("pairs"):
+            report.append("CONCEPT NETWORK:")
+            for a, b, count, lift in network["pairs"][:10]:
+                report.append(f"  {a} ↔ {b} ({count}, lift={lift:.1f})")
+            if network["communities"]:
+                report.append("  Clusters:")
+                for i, community in enumerate(network["communities"][:5], 1):
+                    members = " · ".join(community[:8])
+                    if len(community) > 8:
+                        members += f" (+{len(community) - 8})"
+                    report.append(f"    [{i}] {members}")
+            report.append("")
+
+        # 抽样估计
+        approximation = results.get("approximation")
+        if approximation:
+            report.append(
+                f"APPROXIMATION ({approximation['confidence']:.0%} confidence):"
+            )
+            note = " [time budget exhausted]" if approximation["budget_exhausted"] else ""
+            report.append(
+                f"  Sample: {approximation['sample_size']:,} of "
+                f"{approximation['population']:,} entries "
+                f"({approximation['sample_rate']:.1%}) in {approximation['elapsed']:.2f}s{note}"
+            )
+            if "total_words" in approximation:
+                words, margin = approximation["total_words"]
+                report.append(f"  Total Words: {words:,.0f} ± {margin:,.0f}")
+                words, margin = approximation["avg_words"]
+                report.append(f"  Average Words/Entry: {words:.1f} ± {margin:.1f}")
+                shares = [
+                    f"{status} {share:.1%} ± {margin:.1%}"
+                    for status, share, margin in approximation["status"][:5]
+                ]
+                report.append(f"  Status: {' | '.join(shares)}")
+                report.append("  Concepts:")
+                for concept, freq, margin in approximation["concepts"]:
+                    report.append(f"    {concept}: {freq:,.0f} ± {margin:,.0f}")
+            report.append("")
+
+        # 分库明细
+        if results.get("vaults"):
+            report.append("VAULT BREAKDOWN:")
+            for name, vault in results["vaults"].items():
+                count = vault["total_files"]
+                percentage = count / total_files * 100 if total_files > 0 else 0
+                report.append(
+                    f"  {name}: {count} entries ({percentage:.1f}%), "
+                    f"{vault['total_words']:,} words, {vault['velocity']:.2f}/day"
+                )
+                major_counts = [
+                    (major_name, sum(vault["layers"].get(key, 0) for key in layer_keys))
+                    for major_name, layer_keys in self.major_layers.items()
+                ]
+                major_counts = [(n, c) for n, c in major_counts if c > 0]
+                major_counts.sort(key=lambda item: item[1], reverse=True)
+                if major_counts:
+                    report.append(
+                        "    └─ " + " | ".join(f"{n} {c}" for n, c in major_counts)
+                    )
+                if vault["top_concepts"]:
+                    report.append(
+                        "    └─ "
+                        + " | ".join(f"{c}({f})" for c, f in vault["top_concepts"])
+                    )
+                if vault["warnings"]:
+                    report.append(f"    └─ {len(vault['warnings'])} warning(s)")
+            report.append("")
+
         # 健康警告
         if results["warnings"]:
             report.append("⚠️  HEALTH DIAGNOSTICS:")
@@ -608,28 +638,46 @@ def main():
                        help='Save report to _sum directory')
     parser.add_argument('--quiet', action='store_true',
                        help='Only print warnings and errors')
-    parser.add_argument('--corpus-dir', 
-                       help='Override CORPUS_DIR environment variable')
+    parser.add_argument('--corpus-dir', action='append',
+                       help='Override CORPUS_DIR environment variable; repeat to analyze several vaults together')
+    parser.add_argument('--git', action='store_true',
+                       help='Use git first-commit times as creation times of undated notes')
+    parser.add_argument('--network-top-k', type=int, default=50,
+                       help='Number of top concepts used for the co-occurrence network')
+    parser.add_argument('--approximate', action='store_true',
+                       help='Estimate from a stratified random sample of notes instead of reading all of them')
+    parser.add_argument('--sample-rate', type=float,
+                       help='Fraction of notes sampled per layer (implies --approximate, default 0.05)')
+    parser.add_argument('--time-budget', type=float,
+                       help='Stop sampling after this many seconds (implies --approximate, default 1.0)')
     
     args = parser.parse_args()
     
-    # 获取Corpus目录（改进版）
-    corpus_dir = args.corpus_dir or os.environ.get('CORPUS_DIR')
+    # 获取Corpus目录（可为多个：重复 --corpus-dir 或 CORPUS_DIRS，以路径分隔符分隔）
+    corpus_dirs = args.corpus_dir
+    if not corpus_dirs and os.environ.get('CORPUS_DIRS'):
+        corpus_dirs = [d for d in os.environ['CORPUS_DIRS'].split(os.pathsep) if d]
+    if not corpus_dirs and os.environ.get('CORPUS_DIR'):
+        corpus_dirs = [os.environ['CORPUS_DIR']]
     
-    if not corpus_dir:
+    if not corpus_dirs:
         print("Error: CORPUS_DIR environment variable not set and --corpus-dir not provided", file=sys.stderr)
         print("Please set CORPUS_DIR or use --corpus-dir=/path/to/corpus", file=sys.stderr)
         sys.exit(1)
     
     # 验证目录存在
-    corpus_path = Path(corpus_dir)
-    if not corpus_path.exists():
-        print(f"Error: Corpus directory does not exist: {corpus_dir}", file=sys.stderr)
-        sys.exit(1)
-    
-    if not corpus_path.is_dir():
-        print(f"Error: CORPUS_DIR is not a directory: {corpus_dir}", file=sys.stderr)
-        sys.exit(1)
+    for corpus_dir in corpus_dirs:
+        corpus_path = Path(corpus_dir)
+        if not corpus_path.exists():
+            print(f"Error: Corpus directory does not exist: {corpus_dir}", file=sys.stderr)
+            sys.exit(1)
+        
+        if not corpus_path.is_dir():
+            print(f"Error: CORPUS_DIR is not a directory: {corpus_dir}", file=sys.stderr)
+            sys.exit(1)
+    # 去重并保持顺序；报告保存到第一个 Corpus
+    corpus_dirs = list(dict.fromkeys(str(Path(d).resolve()) for d in corpus_dirs))
+    corpus_dir = corpus_dirs[0]
     
     # 后续代码保持不变...
     # 解析时间段
@@ -654,9 +702,38 @@ def main():
     if args.layer:
         layers = [l.strip() for l in args.layer.split(",")]
 
-    # 执行分析
-    summarizer = CorpusSummarizer(corpus_dir)
-    results = summarizer.analyze_period(start_date, end_date, layers)
+    # 执行分析（多个 Corpus 时并行分析后合并）
+    approximate = (
+        args.approximate or args.sample_rate is not None or args.time_budget is not None
+    )
+    if approximate and args.sample_rate is not None and not 0 < args.sample_rate <= 1:
+        print("Error: --sample-rate must be in (0, 1]", file=sys.stderr)
+        sys.exit(1)
+    if approximate and len(corpus_dirs) > 1:
+        print("Error: --approximate supports a single corpus directory", file=sys.stderr)
+        sys.exit(1)
+
+    if len(corpus_dirs) > 1:
+        from corpus_federation import analyze_vaults
+
+        summarizer, results = analyze_vaults(
+            corpus_dirs, start_date, end_date, layers,
+            network_top_k=args.network_top_k, use_git=args.git,
+        )
+    else:
+        summarizer = CorpusSummarizer(corpus_dir, network_top_k=args.network_top_k)
+        if args.git and not summarizer.load_git_history():
+            print("Warning: --git ignored, CORPUS_DIR is not in a git work tree", file=sys.stderr)
+        if approximate:
+            from corpus_sampling import approximate_period
+
+            results = approximate_period(
+                summarizer, start_date, end_date, layers,
+                sample_rate=args.sample_rate or 0.05,
+                time_budget=1.0 if args.time_budget is None else args.time_budget,
+            )
+        else:
+            results = summarizer.analyze_period(start_date, end_date, layers)
 
     # 生成报告
     report = summarizer.generate_report(results, args.format)
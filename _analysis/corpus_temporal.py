@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# _analysis/corpus_temporal.py
+
+from array import array
+from datetime import date, timedelta
+
+DAY_NAMES = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+MONTH_MARKS = "JFMAMJJASOND"
+SHADES = " ·░▒▓█"
+
+
+def _shade(value, peak):
+    """将计数映射为热力图字符"""
+    if value <= 0 or peak <= 0:
+        return SHADES[0]
+    level = 1 + (value * (len(SHADES) - 2)) // peak
+    return SHADES[min(level, len(SHADES) - 1)]
+
+
+class TemporalProfile:
+    """固定分箱的时间分布：24×7 时段矩阵、逐日日历与各层级活跃日
+
+    内存只取决于时间段长度，与笔记数量无关；不同 worker 或已存储的
+    汇总可通过 merge() 合并。
+    """
+
+    def __init__(self, start_date, end_date):
+        self.origin = _as_date(start_date).toordinal()
+        self.n_days = max(_as_date(end_date).toordinal() - self.origin + 1, 1)
+        # 下标 hour * 7 + weekday
+        self.hour_weekday = array("L", [0]) * (24 * 7)
+        self.calendar = array("L", [0]) * self.n_days
+        # 层级 -> 逐日活跃标记
+        self.layer_days = {}
+        self.total = 0
+
+    # -----------------------
+    # 累加与合并
+    # -----------------------
+    def add(self, created, layer=None):
+        """记录一次创作"""
+        self.hour_weekday[created.hour * 7 + created.weekday()] += 1
+        offset = created.toordinal() - self.origin
+        if 0 <= offset < self.n_days:
+            self.calendar[offset] += 1
+            if layer:
+                days = self.layer_days.get(layer)
+                if days is None:
+                    days = self.layer_days[layer] = bytearray(self.n_days)
+                days[offset] = 1
+        self.total += 1
+
+    def merge(self, other):
+        """合并另一份分布（时间范围取并集）"""
+        origin = min(self.origin, other.origin)
+        end = max(self.origin + self.n_days, other.origin + other.n_days)
+        if origin != self.origin or end != self.origin + self.n_days:
+            self._realign(origin, end - origin)
+
+        for i, value in enumerate(other.hour_weekday):
+            self.hour_weekday[i] += value
+
+        shift = other.origin - self.origin
+        for i, value in enumerate(other.calendar):
+            if value:
+                self.calendar[shift + i] += value
+
+        for layer, other_days in other.layer_days.items():
+            days = self.layer_days.get(layer)
+            if days is None:
+                days = self.layer_days[layer] = bytearray(self.n_days)
+            for i, active in enumerate(other_days):
+                if active:
+                    days[shift + i] = 1
+
+        self.total += other.total
+        return self
+
+    def _realign(self, origin, n_days):
+        shift = self.origin - origin
+        calendar = array("L", [0]) * n_days
+        calendar[shift : shift + self.n_days] = self.calendar
+        self.calendar = calendar
+        for layer, days in self.layer_days.items():
+            resized = bytearray(n_days)
+            resized[shift : shift + self.n_days] = days
+            self.layer_days[layer] = resized
+        self.origin = origin
+        self.n_days = n_days
+
+    # -----------------------
+    # 统计
+    # -----------------------
+    def hour_totals(self):
+        return [sum(self.hour_weekday[h * 7 : h * 7 + 7]) for h in range(24)]
+
+    def weekday_totals(self):
+        return [sum(self.hour_weekday[d::7]) for d in range(7)]
+
+    def peak_hours(self, n=3):
+        """最活跃的时段 [(hour, count)]"""
+        ranked = sorted(enumerate(self.hour_totals()), key=lambda x: (-x[1], x[0]))
+        return [(hour, count) for hour, count in ranked[:n] if count > 0]
+
+    def active_days(self, n=3):
+        """最活跃的星期 [(weekday, count)]"""
+        ranked = sorted(enumerate(self.weekday_totals()), key=lambda x: (-x[1], x[0]))
+        return [(day, count) for day, count in ranked[:n] if count > 0]
+
+    def layer_streaks(self):
+        """各层级的活跃天数、最长连续、当前连续与最长间隔（天）"""
+        stats = {}
+        for layer, days in self.layer_days.items():
+            longest = current = gap = longest_gap = 0
+            seen_active = False
+            for active in days:
+                if active:
+                    current += 1
+                    longest = max(longest, current)
+                    if seen_active:
+                        longest_gap = max(longest_gap, gap)
+                    gap = 0
+                    seen_active = True
+                else:
+                    current = 0
+                    gap += 1
+            stats[layer] = {
+                "active_days": sum(days),
+                "longest_streak": longest,
+                "current_streak": current,
+                "longest_gap": longest_gap,
+                "days_since_last": gap if seen_active else None,
+            }
+        return stats
+
+    # -----------------------
+    # 渲染
+    # -----------------------
+    def render_hour_weekday(self):
+        """星期 × 小时热力图"""
+        peak = max(self.hour_weekday) if self.total else 0
+        lines = [("      " + "".join(f"{h:<6d}" for h in range(0, 24, 6))).rstrip()]
+        for day in range(7):
+            cells = "".join(
+                _shade(self.hour_weekday[h * 7 + day], peak) for h in range(24)
+            )
+            lines.append(f"  {DAY_NAMES[day]}{cells}".rstrip())
+        return lines
+
+    def render_calendar(self):
+        """逐年日历热力图（列为周，行为星期）"""
+        peak = max(self.calendar) if self.total else 0
+        first = date.fromordinal(self.origin)
+        last = date.fromordinal(self.origin + self.n_days - 1)
+
+        lines = []
+        for year in range(first.year, last.year + 1):
+            block_start = max(first, date(year, 1, 1))
+            block_end = min(last, date(year, 12, 31))
+            offset = block_start.toordinal() - self.origin
+            if not any(self.calendar[offset : offset + (block_end - block_start).days + 1]):
+                # 整年没有记录时不输出该年
+                continue
+            week_start = block_start - timedelta(days=block_start.weekday())
+            n_weeks = (block_end - week_start).days // 7 + 1
+
+            # 月份标记放在包含该月 1 日的那一周
+            header = [" "] * n_weeks
+            header[0] = MONTH_MARKS[block_start.month - 1]
+            for month in range(block_start.month + 1, block_end.month + 1):
+                week = (date(year, month, 1) - week_start).days // 7
+                header[week] = MONTH_MARKS[month - 1]
+            lines.append((f"  {year} " + "".join(header)).rstrip())
+
+            for day in range(7):
+                cells = []
+                for week in range(n_weeks):
+                    current = week_start + timedelta(weeks=week, days=day)
+                    if current < block_start or current > block_end:
+                        cells.append(" ")
+                    else:
+                        cells.append(
+                            _shade(self.calendar[current.toordinal() - self.origin], peak)
+                        )
+                lines.append((f"  {DAY_NAMES[day]} " + "".join(cells)).rstrip())
+        return lines
+
+    # -----------------------
+    # 序列化（存储汇总）
+    # -----------------------
+    def to_dict(self):
+        return {
+            "origin": date.fromordinal(self.origin).isoformat(),
+            "n_days": self.n_days,
+            "total": self.total,
+            "hour_weekday": list(self.hour_weekday),
+            "calendar": list(self.calendar),
+            "layer_days": {
+                layer: [i for i, active in enumerate(days) if active]
+                for layer, days in self.layer_days.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        start = date.fromisoformat(data["origin"])
+        profile = cls(start, start + timedelta(days=data["n_days"] - 1))
+        profile.hour_weekday = array("L", data["hour_weekday"])
+        profile.calendar = array("L", data["calendar"])
+        for layer, offsets in data["layer_days"].items():
+            days = profile.layer_days[layer] = bytearray(profile.n_days)
+            for i in offsets:
+                days[i] = 1
+        profile.total = data["total"]
+        return profile
+
+
+def _as_date(value):
+    return value.date() if hasattr(value, "date") else value
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# _analysis/corpus_walker.py
+
+import os
+from pathlib import Path
+
+# 不进入的目录：报告、归档、配置与版本控制
+SKIP_DIRS = {"_sum", "_archive", ".obsidian", ".git", ".trash"}
+
+
+def is_note_file(name):
+    """是否为笔记文件（排除模板、README 与 _xxx_.md 索引页）"""
+    return (
+        name.endswith(".md")
+        and not name.startswith("tp_")
+        and name != "README.md"
+        and not (name.startswith("_") and name.endswith("_.md"))
+    )
+
+
+class _TrieNode:
+    __slots__ = ("children", "layer")
+
+    def __init__(self):
+        self.children = {}
+        self.layer = None
+
+
+class LayerTrie:
+    """按路径段构建的层级前缀树，解析结果取最深的匹配层级"""
+
+    def __init__(self, layer_map):
+        self.root = _TrieNode()
+        for layer_key, layer_path in layer_map.items():
+            node = self.root
+            for segment in Path(layer_path).parts:
+                node = node.children.setdefault(segment, _TrieNode())
+            node.layer = layer_key
+
+    def resolve(self, relpath):
+        """从相对路径解析层级，不属于任何层级时返回 None"""
+        node = self.root
+        layer = None
+        for segment in Path(relpath).parts:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.layer:
+                layer = node.layer
+        return layer
+
+
+class CorpusWalker:
+    """单次递归遍历整个 Corpus，产出 (DirEntry, 层级) """
+
+    def __init__(self, corpus_dir, layer_map):
+        self.corpus_dir = Path(corpus_dir)
+        self.trie = LayerTrie(layer_map)
+
+    def resolve(self, relpath):
+        """按与 walk() 相同的规则判断单个路径，返回层级或 None"""
+        parts = Path(relpath).parts
+        if not parts or not is_note_file(parts[-1]):
+            return None
+        if any(part in SKIP_DIRS or part.startswith(".") for part in parts[:-1]):
+            return None
+        return self.trie.resolve(Path(*parts[:-1])) if len(parts) > 1 else None
+
+    def walk(self, layers=None):
+        """遍历层级目录及其子目录下的全部笔记"""
+        stack = [(str(self.corpus_dir), self.trie.root, None)]
+        while stack:
+            path, node, layer = stack.pop()
+            try:
+                entries = os.scandir(path)
+            except OSError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if name in SKIP_DIRS or name.startswith("."):
+                            continue
+                        child = node.children.get(name) if node else None
+                        # 层级树之外、且不在任何层级之下的目录无需进入
+                        if child is None and layer is None:
+                            continue
+                        child_layer = child.layer if child and child.layer else layer
+                        stack.append((entry.path, child, child_layer))
+                    elif layer and is_note_file(name):
+                        if layers and layer not in layers:
+                            continue
+                        if entry.is_file():
+                            yield entry, layer